@@ -7,83 +7,255 @@ Configuration settings for the E-commerce Sales ETL pipeline.
 
 import os
 from datetime import datetime, timedelta
+from functools import cached_property
+
+# Directories already created or confirmed by ensure_dir() in this process
+_ENSURED = set()
+
+def ensure_dir(path):
+    """Create a directory (and any parents) once per process."""
+    if path in _ENSURED:
+        return
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        os.makedirs(path, exist_ok=True)
+    _ENSURED.add(path)
 
 class Config:
-    """Configuration class for ETL pipeline settings."""
-    
+    """
+    Configuration class for ETL pipeline settings.
+
+    Settings derived from the environment, the filesystem or the clock are
+    computed on first access and cached on the instance, so creating a Config
+    only pays for the subsystems a caller actually uses.
+    """
+
     def __init__(self):
-        # Base paths
-        self.base_dir = os.path.dirname(os.path.abspath(__file__))
-        self.data_dir = os.path.join(self.base_dir, 'data')
-        self.logs_dir = os.path.join(self.base_dir, 'logs')
-        
-        # Ensure directories exist
-        os.makedirs(self.data_dir, exist_ok=True)
-        os.makedirs(self.logs_dir, exist_ok=True)
-        os.makedirs(os.path.join(self.data_dir, 'processed'), exist_ok=True)
-        
-        # Input data paths
-        self.orders_csv = os.path.join(self.data_dir, 'orders.csv')
-        self.products_json = os.path.join(self.data_dir, 'products.json')
-        self.customers_excel = os.path.join(self.data_dir, 'customers.xlsx')
-        self.invoices_pdf = os.path.join(self.data_dir, 'invoices.pdf')
-        self.inventory_xml = os.path.join(self.data_dir, 'inventory.xml')
-        self.historical_db = os.path.join(self.data_dir, 'historical_sales.db')
-        
-        # FTP settings
-        self.ftp_host = os.environ.get('FTP_HOST', 'ftp.example.com')
-        self.ftp_user = os.environ.get('FTP_USER', 'user')
-        self.ftp_password = os.environ.get('FTP_PASSWORD', 'password')
-        self.ftp_port = int(os.environ.get('FTP_PORT', 21))
-        self.ftp_path = os.environ.get('FTP_PATH', '/exports/')
-        
-        # Email settings for data extraction
-        self.email_server = os.environ.get('EMAIL_SERVER', 'imap.example.com')
-        self.email_user = os.environ.get('EMAIL_USER', 'user@example.com')
-        self.email_password = os.environ.get('EMAIL_PASSWORD', 'password')
-        
-        # API settings for e-commerce platforms
-        self.shopify_api_key = os.environ.get('SHOPIFY_API_KEY', 'demo_key')
-        self.shopify_api_secret = os.environ.get('SHOPIFY_API_SECRET', 'demo_secret')
-        self.shopify_store = os.environ.get('SHOPIFY_STORE', 'demo-store.myshopify.com')
-        
-        self.amazon_access_key = os.environ.get('AMAZON_ACCESS_KEY', 'demo_key')
-        self.amazon_secret_key = os.environ.get('AMAZON_SECRET_KEY', 'demo_secret')
-        self.amazon_seller_id = os.environ.get('AMAZON_SELLER_ID', 'demo_seller')
-        self.amazon_marketplace_id = os.environ.get('AMAZON_MARKETPLACE_ID', 'ATVPDKIKX0DER')  # US marketplace
-        
-        # Output data paths
-        self.processed_data_dir = os.path.join(self.data_dir, 'processed')
-        self.output_csv = os.path.join(self.processed_data_dir, f'sales_data_{datetime.now().strftime("%Y%m%d")}.csv')
-        self.reports_dir = os.path.join(self.processed_data_dir, 'reports')
-        os.makedirs(self.reports_dir, exist_ok=True)
-        
+        # Snapshot of the process environment for this instance; refreshed by reload_env()
+        self._environ = dict(os.environ)
+
         # Database settings
         self.db_type = 'sqlite'  # 'sqlite', 'mysql', 'postgresql', 'mongodb'
-        self.db_path = os.path.join(self.data_dir, 'ecommerce_sales.db')
-        self.db_connection_string = f'sqlite:///{self.db_path}'
-        
-        # MySQL settings
-        self.mysql_host = os.environ.get('MYSQL_HOST', 'localhost')
-        self.mysql_port = int(os.environ.get('MYSQL_PORT', 3306))
-        self.mysql_user = os.environ.get('MYSQL_USER', 'root')
-        self.mysql_password = os.environ.get('MYSQL_PASSWORD', 'password')
-        self.mysql_database = os.environ.get('MYSQL_DATABASE', 'ecommerce_etl')
-        
-        # MongoDB settings
-        self.mongo_uri = os.environ.get('MONGO_URI', 'mongodb://localhost:27017/')
-        self.mongo_db = os.environ.get('MONGO_DB', 'ecommerce_etl')
-        
-        # Default query parameters
-        self.default_start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-        self.default_end_date = datetime.now().strftime('%Y-%m-%d')
-        
+
         # Analysis parameters
         self.sales_trend_window = 7  # 7-day sales trend
         self.inventory_threshold = 10  # Alert if inventory falls below this
         self.customer_segment_count = 5  # Number of customer segments
-        
+
         # Validation thresholds
         self.max_missing_percentage = 0.1  # Maximum allowed percentage of missing values
         self.min_order_value = 0.01
         self.max_order_value = 10000.0  # Flag suspicious orders above this value
+
+    def _env(self, key, default, cast=str):
+        """Look up a setting in the environment snapshot, falling back to default."""
+        return cast(self._environ.get(key, default))
+
+    def reload_env(self):
+        """
+        Re-read the process environment and drop this instance's cached settings.
+
+        Other Config instances keep their own snapshot until they are reloaded.
+        """
+        self._environ = dict(os.environ)
+        for name, attr in vars(type(self)).items():
+            if isinstance(attr, cached_property):
+                self.__dict__.pop(name, None)
+
+    # Base paths
+    @cached_property
+    def base_dir(self):
+        return os.path.dirname(os.path.abspath(__file__))
+
+    @cached_property
+    def data_dir(self):
+        path = os.path.join(self.base_dir, 'data')
+        ensure_dir(path)
+        return path
+
+    @cached_property
+    def logs_dir(self):
+        path = os.path.join(self.base_dir, 'logs')
+        ensure_dir(path)
+        return path
+
+    # Input data paths
+    @cached_property
+    def orders_csv(self):
+        return os.path.join(self.data_dir, 'orders.csv')
+
+    @cached_property
+    def products_json(self):
+        return os.path.join(self.data_dir, 'products.json')
+
+    @cached_property
+    def customers_excel(self):
+        return os.path.join(self.data_dir, 'customers.xlsx')
+
+    @cached_property
+    def invoices_pdf(self):
+        return os.path.join(self.data_dir, 'invoices.pdf')
+
+    @cached_property
+    def inventory_xml(self):
+        return os.path.join(self.data_dir, 'inventory.xml')
+
+    @cached_property
+    def historical_db(self):
+        return os.path.join(self.data_dir, 'historical_sales.db')
+
+    # FTP settings
+    @cached_property
+    def ftp_host(self):
+        return self._env('FTP_HOST', 'ftp.example.com')
+
+    @cached_property
+    def ftp_user(self):
+        return self._env('FTP_USER', 'user')
+
+    @cached_property
+    def ftp_password(self):
+        return self._env('FTP_PASSWORD', 'password')
+
+    @cached_property
+    def ftp_port(self):
+        return self._env('FTP_PORT', 21, int)
+
+    @cached_property
+    def ftp_path(self):
+        return self._env('FTP_PATH', '/exports/')
+
+    @cached_property
+    def ftp_max_workers(self):
+        # Concurrent FTP sessions used for downloading files
+        return self._env('FTP_MAX_WORKERS', 4, int)
+
+    # Email settings for data extraction
+    @cached_property
+    def email_server(self):
+        return self._env('EMAIL_SERVER', 'imap.example.com')
+
+    @cached_property
+    def email_user(self):
+        return self._env('EMAIL_USER', 'user@example.com')
+
+    @cached_property
+    def email_password(self):
+        return self._env('EMAIL_PASSWORD', 'password')
+
+    @cached_property
+    def email_archive_attachments(self):
+        # Keep a copy of processed attachments under data/email
+        return self._env('EMAIL_ARCHIVE_ATTACHMENTS', 'true').lower() in ('1', 'true', 'yes')
+
+    # API settings for e-commerce platforms
+    @cached_property
+    def shopify_api_key(self):
+        return self._env('SHOPIFY_API_KEY', 'demo_key')
+
+    @cached_property
+    def shopify_api_secret(self):
+        return self._env('SHOPIFY_API_SECRET', 'demo_secret')
+
+    @cached_property
+    def shopify_store(self):
+        return self._env('SHOPIFY_STORE', 'demo-store.myshopify.com')
+
+    @cached_property
+    def api_response_cache(self):
+        # Reuse raw API responses for date windows that have already closed
+        return self._env('API_RESPONSE_CACHE', 'true').lower() in ('1', 'true', 'yes')
+
+    @cached_property
+    def amazon_access_key(self):
+        return self._env('AMAZON_ACCESS_KEY', 'demo_key')
+
+    @cached_property
+    def amazon_secret_key(self):
+        return self._env('AMAZON_SECRET_KEY', 'demo_secret')
+
+    @cached_property
+    def amazon_seller_id(self):
+        return self._env('AMAZON_SELLER_ID', 'demo_seller')
+
+    @cached_property
+    def amazon_marketplace_id(self):
+        return self._env('AMAZON_MARKETPLACE_ID', 'ATVPDKIKX0DER')  # US marketplace
+
+    # Output data paths
+    @cached_property
+    def processed_data_dir(self):
+        path = os.path.join(self.data_dir, 'processed')
+        ensure_dir(path)
+        return path
+
+    @cached_property
+    def output_csv(self):
+        return os.path.join(self.processed_data_dir, f'sales_data_{self._now.strftime("%Y%m%d")}.csv')
+
+    @cached_property
+    def reports_dir(self):
+        path = os.path.join(self.processed_data_dir, 'reports')
+        ensure_dir(path)
+        return path
+
+    # Database settings
+    @cached_property
+    def db_path(self):
+        return os.path.join(self.data_dir, 'ecommerce_sales.db')
+
+    @cached_property
+    def db_read_pool_size(self):
+        # Idle SQLite read connections kept open per database file
+        return self._env('DB_READ_POOL_SIZE', 4, int)
+
+    @cached_property
+    def db_connection_string(self):
+        return f'sqlite:///{self.db_path}'
+
+    # MySQL settings
+    @cached_property
+    def mysql_host(self):
+        return self._env('MYSQL_HOST', 'localhost')
+
+    @cached_property
+    def mysql_port(self):
+        return self._env('MYSQL_PORT', 3306, int)
+
+    @cached_property
+    def mysql_user(self):
+        return self._env('MYSQL_USER', 'root')
+
+    @cached_property
+    def mysql_password(self):
+        return self._env('MYSQL_PASSWORD', 'password')
+
+    @cached_property
+    def mysql_database(self):
+        return self._env('MYSQL_DATABASE', 'ecommerce_etl')
+
+    # MongoDB settings
+    @cached_property
+    def mongo_uri(self):
+        return self._env('MONGO_URI', 'mongodb://localhost:27017/')
+
+    @cached_property
+    def mongo_db(self):
+        return self._env('MONGO_DB', 'ecommerce_etl')
+
+    # Default query parameters
+    @cached_property
+    def _now(self):
+        # Single timestamp shared by the date defaults and dated output paths
+        return datetime.now()
+
+    @cached_property
+    def default_start_date(self):
+        return (self._now - timedelta(days=30)).strftime('%Y-%m-%d')
+
+    @cached_property
+    def default_end_date(self):
+        return self._now.strftime('%Y-%m-%d')
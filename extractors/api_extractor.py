@@ -7,14 +7,100 @@ API Extractor module for extracting e-commerce data from various platform APIs.
 
 import logging
 import pandas as pd
+import numpy as np
 import os
 import json
+import gzip
+import hashlib
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+from config import ensure_dir
 
 logger = logging.getLogger(__name__)
 
+# Shopify Admin REST API version used for real extraction
+SHOPIFY_API_VERSION = '2024-01'
+
+# Timeout in seconds for each API request
+REQUEST_TIMEOUT = 30
+
+# Age in seconds after which cached API responses are fetched again
+RESPONSE_CACHE_TTL = 7 * 24 * 3600
+
+def _flatten_shopify_order(order):
+    """Flatten a Shopify order record into a row tuple."""
+    customer = order.get('customer') or {}
+    return (
+        str(order['id']),
+        order.get('order_number'),
+        str(customer['id']) if 'id' in customer else None,
+        order.get('created_at'),
+        float(order.get('total_price') or 0),
+        order.get('currency'),
+        order.get('financial_status'),
+        sum(item.get('quantity', 0) for item in order.get('line_items', []))
+    )
+
+def _flatten_shopify_product(product):
+    """Flatten a Shopify product record into a row tuple."""
+    variants = product.get('variants') or [{}]
+    return (
+        str(product['id']),
+        product.get('title'),
+        product.get('product_type'),
+        product.get('created_at'),
+        product.get('vendor'),
+        sum(variant.get('inventory_quantity') or 0 for variant in variants),
+        float(variants[0].get('price') or 0)
+    )
+
+def _flatten_shopify_customer(customer):
+    """Flatten a Shopify customer record into a row tuple."""
+    return (
+        str(customer['id']),
+        customer.get('first_name'),
+        customer.get('last_name'),
+        customer.get('email'),
+        customer.get('created_at'),
+        customer.get('orders_count'),
+        float(customer.get('total_spent') or 0)
+    )
+
+# Known Shopify record layouts (same columns as the mock data) and their flatteners
+SHOPIFY_SCHEMAS = {
+    'orders': (
+        ['id', 'order_number', 'customer_id', 'created_at', 'total_price', 'currency', 'financial_status', 'item_count'],
+        _flatten_shopify_order
+    ),
+    'products': (
+        ['id', 'title', 'product_type', 'created_at', 'vendor', 'inventory_quantity', 'price'],
+        _flatten_shopify_product
+    ),
+    'customers': (
+        ['id', 'first_name', 'last_name', 'email', 'created_at', 'orders_count', 'total_spent'],
+        _flatten_shopify_customer
+    )
+}
+
+# Fixed query parameters per Shopify resource, and whether it filters on created_at
+SHOPIFY_QUERIES = {
+    'orders': ({'limit': 250, 'status': 'any'}, True),
+    'products': ({'limit': 250}, False),
+    'customers': ({'limit': 250}, True)
+}
+
 class APIExtractor:
     """Extracts e-commerce data from various platform APIs."""
     
@@ -40,7 +126,17 @@ class APIExtractor:
         
         # Output directory
         self.output_dir = os.path.join(config.data_dir, 'api')
-        os.makedirs(self.output_dir, exist_ok=True)
+        ensure_dir(self.output_dir)
+        
+        # Raw API responses for closed date windows, reused across reruns
+        # (None when API_RESPONSE_CACHE is turned off)
+        self.cache_dir = os.path.join(self.output_dir, 'cache') if config.api_response_cache else None
+        
+        # Keep-alive HTTP session shared by all API requests, retrying
+        # rate-limited and transient server errors with backoff
+        self._session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        self._session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
     
     def extract(self, platform=None, start_date=None, end_date=None, resource_type=None):
         """
@@ -68,47 +164,46 @@ class APIExtractor:
         
         logger.info(f"Extracting {resource_type} data from {platform} platform")
         
-        # Parse dates
-        if start_date:
-            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d')
-        else:
+        # Parse dates once; everything below works on datetime objects
+        if not start_date:
             # Default to 30 days ago
-            start_date_obj = datetime.now() - timedelta(days=30)
-            start_date = start_date_obj.strftime('%Y-%m-%d')
+            start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
         
-        if end_date:
-            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
-        else:
+        if not end_date:
             # Default to today
-            end_date_obj = datetime.now()
-            end_date = end_date_obj.strftime('%Y-%m-%d')
+            end_date = datetime.now().strftime('%Y-%m-%d')
+        
+        start_date_obj = _parse_date(start_date)
+        end_date_obj = _parse_date(end_date)
         
         # Extract data based on platform
         if platform.lower() == 'all':
-            # Extract from all supported platforms and combine
+            # Extract from all supported platforms concurrently and combine
             all_data = []
             
-            # Try Shopify
-            try:
-                shopify_data = self._extract_from_shopify(resource_type, start_date, end_date)
-                if shopify_data is not None and not shopify_data.empty:
-                    shopify_data['platform'] = 'shopify'
-                    all_data.append(shopify_data)
-            except Exception as e:
-                logger.error(f"Error extracting from Shopify: {str(e)}")
-            
-            # Try Amazon
-            try:
-                amazon_data = self._extract_from_amazon(resource_type, start_date, end_date)
-                if amazon_data is not None and not amazon_data.empty:
-                    amazon_data['platform'] = 'amazon'
-                    all_data.append(amazon_data)
-            except Exception as e:
-                logger.error(f"Error extracting from Amazon: {str(e)}")
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = {
+                    'shopify': executor.submit(self._extract_from_shopify, resource_type, start_date_obj, end_date_obj),
+                    'amazon': executor.submit(self._extract_from_amazon, resource_type, start_date_obj, end_date_obj)
+                }
+                
+                # Collect in submission order so the combined output is stable
+                for platform_name, future in futures.items():
+                    try:
+                        platform_data = future.result()
+                        if platform_data is not None and not platform_data.empty:
+                            all_data.append(platform_data.assign(platform=platform_name))
+                    except Exception as e:
+                        logger.error(f"Error extracting from {platform_name.capitalize()}: {str(e)}")
             
             # Combine data from all platforms
             if all_data:
-                combined_data = pd.concat(all_data, ignore_index=True)
+                # concat already aligns differing platform schemas without losing
+                # dtypes; skip it entirely when there is only one frame to stack
+                if len(all_data) == 1:
+                    combined_data = all_data[0].reset_index(drop=True)
+                else:
+                    combined_data = pd.concat(all_data, ignore_index=True)
                 logger.info(f"Extracted {len(combined_data)} total records from all platforms")
                 return combined_data
             else:
@@ -116,55 +211,210 @@ class APIExtractor:
                 return pd.DataFrame()
             
         elif platform.lower() == 'shopify':
-            return self._extract_from_shopify(resource_type, start_date, end_date)
+            return self._extract_from_shopify(resource_type, start_date_obj, end_date_obj)
             
         elif platform.lower() == 'amazon':
-            return self._extract_from_amazon(resource_type, start_date, end_date)
+            return self._extract_from_amazon(resource_type, start_date_obj, end_date_obj)
             
         else:
             logger.error(f"Unsupported platform: {platform}")
             raise ValueError(f"Unsupported platform: {platform}")
     
+    def _shopify_is_demo(self):
+        """Return True if Shopify is still configured with the demo credentials."""
+        return self.shopify_api_key == 'demo_key' or self.shopify_store == 'demo-store.myshopify.com'
+    
+    def _amazon_is_demo(self):
+        """Return True if Amazon is still configured with the demo credentials."""
+        return self.amazon_access_key == 'demo_key' or self.amazon_seller_id == 'demo_seller'
+    
     def _extract_from_shopify(self, resource_type, start_date, end_date):
         """
         Extract data from Shopify API.
         
         Args:
             resource_type (str): Type of resource to extract ('orders', 'products', 'customers')
-            start_date (str): Start date for filtering in YYYY-MM-DD format
-            end_date (str): End date for filtering in YYYY-MM-DD format
+            start_date (datetime): Start date for filtering
+            end_date (datetime): End date for filtering
         
         Returns:
             pandas.DataFrame: Extracted data
         """
-        logger.info(f"Extracting {resource_type} from Shopify: {start_date} to {end_date}")
+        logger.info(f"Extracting {resource_type} from Shopify: {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}")
         
         # Check if credentials are provided
-        if self.shopify_api_key == 'demo_key' or self.shopify_store == 'demo-store.myshopify.com':
+        if self._shopify_is_demo():
             logger.warning("Using mock Shopify data since no real credentials are configured")
             return self._mock_shopify_data(resource_type, start_date, end_date)
         
-        # In a real implementation, we would connect to the Shopify API
-        # For now, we'll use mock data
-        logger.warning("Using mock Shopify data (real API implementation would be here)")
+        resource = resource_type.lower()
+        if resource not in SHOPIFY_SCHEMAS:
+            logger.warning(f"Unsupported resource type for Shopify: {resource_type}")
+            return pd.DataFrame()
+        columns, flatten = SHOPIFY_SCHEMAS[resource]
+        
+        # Build request for the Shopify Admin REST API
+        endpoint = f"https://{self.shopify_store}/admin/api/{SHOPIFY_API_VERSION}/{resource}.json"
+        base_params, date_filtered = SHOPIFY_QUERIES[resource]
+        params = dict(base_params)
+        if date_filtered:
+            params['created_at_min'] = f"{start_date:%Y-%m-%d}T00:00:00"
+            params['created_at_max'] = f"{end_date:%Y-%m-%d}T23:59:59"
+        auth = (self.shopify_api_key, self.shopify_api_secret)
+        
+        # Only windows that ended before today can no longer change upstream
+        cache_path = None
+        if self.cache_dir and date_filtered and end_date.date() < datetime.now().date():
+            cache_path = self._cache_path(endpoint, params, auth)
+        
+        try:
+            # Records have a known shape, so flatten them directly instead of json_normalize
+            pages = [
+                pd.DataFrame.from_records([flatten(record) for record in page[resource]], columns=columns)
+                for page in self._shopify_payloads(endpoint, params, auth, cache_path)
+            ]
+        except requests.RequestException as e:
+            logger.error(f"Error extracting data from Shopify API: {str(e)}")
+        except (KeyError, ValueError) as e:
+            # Undecodable body or records missing expected fields
+            logger.error(f"Unexpected response from Shopify API: {str(e)}")
+        else:
+            df = pd.concat(pages, ignore_index=True) if pages else pd.DataFrame(columns=columns)
+            logger.info(f"Extracted {len(df)} {resource} from Shopify across {len(pages)} page(s)")
+            return df
+        
+        logger.info("Falling back to mock data...")
         return self._mock_shopify_data(resource_type, start_date, end_date)
     
+    def _shopify_payloads(self, endpoint, params, auth, cache_path=None):
+        """
+        Iterate over the decoded pages of a Shopify list endpoint.
+        
+        When cache_path is given, a fresh cached response is served instead
+        of calling the API, and a complete API response is written back.
+        
+        Args:
+            endpoint (str): URL of the first page
+            params (dict): Query parameters for the first page
+            auth (tuple): Basic auth credentials
+            cache_path (str, optional): Response cache file for this query
+        
+        Yields:
+            dict: Decoded JSON payload of each page
+        """
+        if cache_path:
+            cached = self._cache_get(cache_path)
+            if cached is not None:
+                logger.info(f"Using cached Shopify response: {cache_path}")
+                yield from cached
+                return
+        
+        bodies = []
+        for body in self._shopify_pages(endpoint, params, auth):
+            if cache_path:
+                bodies.append(body)
+            # Parse the raw body once; skips requests' text decoding step
+            yield _json_loads(body)
+        
+        if cache_path:
+            self._cache_put(cache_path, bodies)
+    
+    def _cache_path(self, endpoint, params, auth):
+        """
+        Build the response cache file path for an API query.
+        
+        The key covers the shop and a fingerprint of the credentials as well
+        as the query, so another shop or account never reads this response.
+        
+        Args:
+            endpoint (str): Request URL
+            params (dict): Query parameters
+            auth (tuple): Basic auth credentials
+        
+        Returns:
+            str: Path of the cache file for this query
+        """
+        credentials = hashlib.sha256('\0'.join(auth).encode()).hexdigest()
+        key = hashlib.sha1(f"{self.shopify_store}|{credentials}|{endpoint}|{sorted(params.items())}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json.gz")
+    
+    def _cache_get(self, cache_path):
+        """
+        Load cached response pages if the cache file is fresh.
+        
+        Args:
+            cache_path (str): Path of the cache file
+        
+        Returns:
+            list: Decoded pages, or None if missing, expired or unreadable
+        """
+        try:
+            if time.time() - os.path.getmtime(cache_path) >= RESPONSE_CACHE_TTL:
+                return None
+            with gzip.open(cache_path, 'rb') as f:
+                return _json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+    
+    def _cache_put(self, cache_path, bodies):
+        """
+        Store raw response pages in the cache as one compressed JSON array.
+        
+        Args:
+            cache_path (str): Path of the cache file
+            bodies (list): Raw JSON bodies of each page
+        """
+        ensure_dir(self.cache_dir)
+        
+        # Write to a temporary file first so readers never see a partial cache
+        tmp_path = f"{cache_path}.tmp"
+        with gzip.open(tmp_path, 'wb') as f:
+            f.write(b'[' + b','.join(bodies) + b']')
+        os.replace(tmp_path, cache_path)
+    
+    def _shopify_pages(self, endpoint, params, auth):
+        """
+        Iterate over the pages of a Shopify list endpoint.
+        
+        Follows the cursor in each response's Link header and requests the
+        next page while the caller is still processing the current one.
+        
+        Args:
+            endpoint (str): URL of the first page
+            params (dict): Query parameters for the first page
+            auth (tuple): Basic auth credentials
+        
+        Yields:
+            bytes: Raw JSON body of each page
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self._session.get, endpoint, params=params, auth=auth, timeout=REQUEST_TIMEOUT)
+            while future is not None:
+                response = future.result()
+                response.raise_for_status()
+                
+                # Cursor URLs already carry page_info and limit
+                next_url = response.links.get('next', {}).get('url')
+                future = executor.submit(self._session.get, next_url, auth=auth, timeout=REQUEST_TIMEOUT) if next_url else None
+                
+                yield response.content
+    
     def _extract_from_amazon(self, resource_type, start_date, end_date):
         """
         Extract data from Amazon Seller API.
         
         Args:
             resource_type (str): Type of resource to extract ('orders', 'products', 'inventory')
-            start_date (str): Start date for filtering in YYYY-MM-DD format
-            end_date (str): End date for filtering in YYYY-MM-DD format
+            start_date (datetime): Start date for filtering
+            end_date (datetime): End date for filtering
         
         Returns:
             pandas.DataFrame: Extracted data
         """
-        logger.info(f"Extracting {resource_type} from Amazon: {start_date} to {end_date}")
+        logger.info(f"Extracting {resource_type} from Amazon: {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}")
         
         # Check if credentials are provided
-        if self.amazon_access_key == 'demo_key' or self.amazon_seller_id == 'demo_seller':
+        if self._amazon_is_demo():
             logger.warning("Using mock Amazon data since no real credentials are configured")
             return self._mock_amazon_data(resource_type, start_date, end_date)
         
@@ -179,88 +429,13 @@ class APIExtractor:
         
         Args:
             resource_type (str): Type of resource ('orders', 'products', 'customers')
-            start_date (str): Start date for filtering
-            end_date (str): End date for filtering
+            start_date (datetime): Start date for filtering
+            end_date (datetime): End date for filtering
         
         Returns:
-            pandas.DataFrame: Mock data
+            pandas.DataFrame: Mock data (a copy of the cached frame)
         """
-        logger.info(f"Generating mock Shopify {resource_type} data")
-        
-        # Parse date range
-        start_date_obj = datetime.strptime(start_date, '%Y-%m-%d')
-        end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
-        
-        # Create mock data based on resource type
-        if resource_type.lower() == 'orders':
-            # Generate simplified order data
-            data = []
-            
-            # Use simple customer IDs
-            customer_ids = [str(i+1000) for i in range(20)]
-            
-            for i in range(50):  # Generate 50 orders
-                # Generate a random date within range using standard Python datetime
-                days_range = (end_date_obj - start_date_obj).days
-                if days_range <= 0:
-                    days_range = 1
-                random_days = i % days_range
-                order_date = start_date_obj + timedelta(days=random_days)
-                
-                # Create simple order record
-                order = {
-                    'id': str(i+1000),
-                    'order_number': i+1000,
-                    'customer_id': customer_ids[i % len(customer_ids)],
-                    'created_at': order_date.strftime('%Y-%m-%d'),
-                    'total_price': float(50 + (i % 10) * 10),
-                    'currency': 'USD',
-                    'financial_status': 'paid' if i % 5 != 0 else 'pending',
-                    'item_count': (i % 3) + 1
-                }
-                data.append(order)
-            
-            return pd.DataFrame(data)
-            
-        elif resource_type.lower() == 'products':
-            # Generate simplified product data
-            data = []
-            
-            for i in range(30):  # Generate 30 products
-                product = {
-                    'id': str(i+2000),
-                    'title': f"Shopify Product {i+1}",
-                    'product_type': ['Clothing', 'Electronics', 'Home', 'Books'][i % 4],
-                    'created_at': (start_date_obj - timedelta(days=i % 30)).strftime('%Y-%m-%d'),
-                    'vendor': f"Vendor {(i % 5) + 1}",
-                    'inventory_quantity': (i % 50) + 5,
-                    'price': float(20 + (i % 20) * 5)
-                }
-                data.append(product)
-            
-            return pd.DataFrame(data)
-            
-        elif resource_type.lower() == 'customers':
-            # Generate simplified customer data
-            data = []
-            
-            for i in range(20):  # Generate 20 customers
-                customer = {
-                    'id': str(i+1000),
-                    'first_name': f"First{i+1}",
-                    'last_name': f"Last{i+1}",
-                    'email': f"customer{i+1}@example.com",
-                    'created_at': (start_date_obj - timedelta(days=i*10)).strftime('%Y-%m-%d'),
-                    'orders_count': (i % 8) + 1,
-                    'total_spent': float(100 + i * 50)
-                }
-                data.append(customer)
-            
-            return pd.DataFrame(data)
-        
-        else:
-            logger.warning(f"Unsupported resource type for Shopify: {resource_type}")
-            return pd.DataFrame()
+        return _mock_shopify_frame(resource_type, start_date, end_date).copy()
     
     def _mock_amazon_data(self, resource_type, start_date, end_date):
         """
@@ -268,67 +443,13 @@ class APIExtractor:
         
         Args:
             resource_type (str): Type of resource ('orders', 'products', 'inventory')
-            start_date (str): Start date for filtering
-            end_date (str): End date for filtering
+            start_date (datetime): Start date for filtering
+            end_date (datetime): End date for filtering
         
         Returns:
-            pandas.DataFrame: Mock data
+            pandas.DataFrame: Mock data (a copy of the cached frame)
         """
-        logger.info(f"Generating mock Amazon {resource_type} data")
-        
-        # Parse date range
-        start_date_obj = datetime.strptime(start_date, '%Y-%m-%d')
-        end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
-        
-        # Create mock data based on resource type
-        if resource_type.lower() == 'orders':
-            # Generate simplified Amazon order data
-            data = []
-            
-            for i in range(40):  # Generate 40 orders
-                # Generate a random date within range using standard Python datetime
-                days_range = (end_date_obj - start_date_obj).days
-                if days_range <= 0:
-                    days_range = 1
-                random_days = i % days_range
-                order_date = start_date_obj + timedelta(days=random_days)
-                
-                # Create simple order record
-                order = {
-                    'amazon_order_id': f"A{100000 + i}",
-                    'purchase_date': order_date.strftime('%Y-%m-%d'),
-                    'order_status': 'Shipped' if i % 5 != 0 else 'Pending',
-                    'order_total': float(75 + (i % 15) * 5),
-                    'number_of_items_shipped': (i % 3) + 1,
-                    'shipping_address_state': ['NY', 'CA', 'TX', 'FL'][i % 4],
-                    'shipping_address_country': 'US',
-                    'marketplace_id': self.amazon_marketplace_id
-                }
-                data.append(order)
-            
-            return pd.DataFrame(data)
-            
-        elif resource_type.lower() == 'products' or resource_type.lower() == 'inventory':
-            # Generate simplified product/inventory data
-            data = []
-            
-            for i in range(30):  # Generate 30 products
-                product = {
-                    'sku': f"SKU-{3000 + i}",
-                    'asin': f"B00{1000 + i}",
-                    'product_name': f"Amazon Product {i+1}",
-                    'price': float(15 + (i % 30) * 3),
-                    'quantity': (i % 30) + 2,
-                    'product_category': ['Electronics', 'Home', 'Kitchen', 'Sports'][i % 4],
-                    'condition': 'New' if i % 10 != 0 else 'Used'
-                }
-                data.append(product)
-            
-            return pd.DataFrame(data)
-        
-        else:
-            logger.warning(f"Unsupported resource type for Amazon: {resource_type}")
-            return pd.DataFrame()
+        return _mock_amazon_frame(resource_type, start_date, end_date, self.amazon_marketplace_id).copy()
     
     def save_extracted_data(self, data, platform, resource_type):
         """
@@ -357,12 +478,151 @@ class APIExtractor:
         # Optionally save as JSON
         json_path = os.path.join(self.output_dir, f"{file_name}.json")
         try:
-            # Convert DataFrame to JSON
-            json_data = data.to_json(orient='records', date_format='iso')
-            with open(json_path, 'w') as f:
-                f.write(json_data)
+            # Write JSON straight to the file instead of building the whole string first
+            data.to_json(json_path, orient='records', date_format='iso')
             logger.info(f"Saved extracted data to {json_path}")
         except Exception as e:
             logger.error(f"Error saving data as JSON: {str(e)}")
         
         return csv_path
+
+
+@lru_cache(maxsize=64)
+def _parse_date(date_str):
+    """Parse a YYYY-MM-DD string, caching repeats of the same date."""
+    return datetime.strptime(date_str, '%Y-%m-%d')
+
+
+def _order_date_column(i, start_date, end_date):
+    """Spread mock order rows over the date range, cycling day by day."""
+    days_range = max((end_date - start_date).days, 1)
+    return (pd.Timestamp(start_date) + pd.to_timedelta(i % days_range, unit='D')).strftime('%Y-%m-%d')
+
+
+@lru_cache(maxsize=32)
+def _mock_shopify_frame(resource_type, start_date, end_date):
+    """
+    Build mock Shopify data, cached per argument combination.
+    
+    Counts use small integer dtypes and enum-like strings are categorical
+    to keep the frames compact. The returned frame is shared between calls
+    and must not be modified.
+    """
+    logger.info(f"Generating mock Shopify {resource_type} data")
+    
+    # Create mock data based on resource type
+    resource = resource_type.lower()
+    if resource == 'orders':
+        # Generate 50 simplified orders as column arrays
+        i = np.arange(50)
+        
+        return pd.DataFrame({
+            'id': (i + 1000).astype(str),
+            'order_number': i + 1000,
+            'customer_id': (i % 20 + 1000).astype(str),  # 20 simple customer IDs
+            'created_at': _order_date_column(i, start_date, end_date),
+            'total_price': 50.0 + (i % 10) * 10,
+            'currency': 'USD',
+            'financial_status': np.where(i % 5 != 0, 'paid', 'pending'),
+            'item_count': i % 3 + 1
+        }).astype({
+            'order_number': 'int32',
+            'item_count': 'int8',
+            'currency': 'category',
+            'financial_status': 'category'
+        })
+    
+    elif resource == 'products':
+        # Generate 30 simplified products as column arrays
+        i = np.arange(30)
+        
+        return pd.DataFrame({
+            'id': (i + 2000).astype(str),
+            'title': np.char.add('Shopify Product ', (i + 1).astype(str)),
+            'product_type': np.array(['Clothing', 'Electronics', 'Home', 'Books'])[i % 4],
+            'created_at': (pd.Timestamp(start_date) - pd.to_timedelta(i % 30, unit='D')).strftime('%Y-%m-%d'),
+            'vendor': np.char.add('Vendor ', (i % 5 + 1).astype(str)),
+            'inventory_quantity': i % 50 + 5,
+            'price': 20.0 + (i % 20) * 5
+        }).astype({
+            'product_type': 'category',
+            'vendor': 'category',
+            'inventory_quantity': 'int16'
+        })
+    
+    elif resource == 'customers':
+        # Generate 20 simplified customers as column arrays
+        i = np.arange(20)
+        n = (i + 1).astype(str)
+        
+        return pd.DataFrame({
+            'id': (i + 1000).astype(str),
+            'first_name': np.char.add('First', n),
+            'last_name': np.char.add('Last', n),
+            'email': np.char.add(np.char.add('customer', n), '@example.com'),
+            # Sign-up dates step back ten days per customer
+            'created_at': (pd.Timestamp(start_date) - pd.to_timedelta(i * 10, unit='D')).strftime('%Y-%m-%d'),
+            'orders_count': i % 8 + 1,
+            'total_spent': 100.0 + i * 50
+        }).astype({'orders_count': 'int8'})
+    
+    else:
+        logger.warning(f"Unsupported resource type for Shopify: {resource_type}")
+        return pd.DataFrame()
+
+
+@lru_cache(maxsize=32)
+def _mock_amazon_frame(resource_type, start_date, end_date, marketplace_id):
+    """
+    Build mock Amazon data, cached per argument combination.
+    
+    Counts use small integer dtypes and enum-like strings are categorical
+    to keep the frames compact. The returned frame is shared between calls
+    and must not be modified.
+    """
+    logger.info(f"Generating mock Amazon {resource_type} data")
+    
+    # Create mock data based on resource type
+    resource = resource_type.lower()
+    if resource == 'orders':
+        # Generate 40 simplified Amazon orders as column arrays
+        i = np.arange(40)
+        
+        return pd.DataFrame({
+            'amazon_order_id': np.char.add('A', (100000 + i).astype(str)),
+            'purchase_date': _order_date_column(i, start_date, end_date),
+            'order_status': np.where(i % 5 != 0, 'Shipped', 'Pending'),
+            'order_total': 75.0 + (i % 15) * 5,
+            'number_of_items_shipped': i % 3 + 1,
+            'shipping_address_state': np.array(['NY', 'CA', 'TX', 'FL'])[i % 4],
+            'shipping_address_country': 'US',
+            'marketplace_id': marketplace_id
+        }).astype({
+            'order_status': 'category',
+            'number_of_items_shipped': 'int8',
+            'shipping_address_state': 'category',
+            'shipping_address_country': 'category',
+            'marketplace_id': 'category'
+        })
+    
+    elif resource in ('products', 'inventory'):
+        # Generate 30 simplified products as column arrays
+        i = np.arange(30)
+        
+        return pd.DataFrame({
+            'sku': np.char.add('SKU-', (3000 + i).astype(str)),
+            'asin': np.char.add('B00', (1000 + i).astype(str)),
+            'product_name': np.char.add('Amazon Product ', (i + 1).astype(str)),
+            'price': 15.0 + (i % 30) * 3,
+            'quantity': i % 30 + 2,
+            'product_category': np.array(['Electronics', 'Home', 'Kitchen', 'Sports'])[i % 4],
+            'condition': np.where(i % 10 != 0, 'New', 'Used')
+        }).astype({
+            'quantity': 'int16',
+            'product_category': 'category',
+            'condition': 'category'
+        })
+    
+    else:
+        logger.warning(f"Unsupported resource type for Amazon: {resource_type}")
+        return pd.DataFrame()
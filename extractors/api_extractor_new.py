@@ -9,7 +9,6 @@ import logging
 import pandas as pd
 import os
 import json
-import requests
 from datetime import datetime, timedelta
 import time
 
@@ -8,8 +8,55 @@ CSV Extractor module for extracting e-commerce sales data from CSV files.
 import logging
 import pandas as pd
 import os
+import operator
 from datetime import datetime
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
+# Multi-threaded parser when pyarrow is installed
+_CSV_ENGINE = 'pyarrow' if _HAS_PYARROW else 'c'
+
+# Comparison operators used in (column, op, value) filters
+_FILTER_OPS = {'>=': operator.ge, '<=': operator.le, '==': operator.eq}
+
+# Sample product categories and names (one row of names per category)
+_PRODUCT_CATEGORIES = ('Electronics', 'Clothing', 'Home & Kitchen', 'Books', 'Toys')
+_PRODUCT_NAMES = (
+    ('Smartphone', 'Laptop', 'Headphones', 'Tablet', 'Smart Watch'),
+    ('T-shirt', 'Jeans', 'Dress', 'Jacket', 'Socks'),
+    ('Blender', 'Coffee Maker', 'Toaster', 'Cookware Set', 'Knife Set'),
+    ('Fiction Novel', 'Cookbook', 'Biography', 'Self-Help Book', 'Children Book'),
+    ('Action Figure', 'Board Game', 'Puzzle', 'Stuffed Animal', 'Building Blocks')
+)
+
+# Customer segments
+_CUSTOMER_SEGMENTS = ('New', 'Regular', 'VIP', 'Inactive', 'Wholesale')
+
+# Payment methods
+_PAYMENT_METHODS = ('Credit Card', 'PayPal', 'Bank Transfer', 'Cash on Delivery', 'Gift Card')
+
+# Shipping methods
+_SHIPPING_METHODS = ('Standard', 'Express', 'Next Day', 'International', 'Local Pickup')
+
+# Customer locations
+_CITIES = ('New York', 'Los Angeles', 'Chicago', 'Houston', 'Miami', 'Seattle', 'Boston')
+_STATES = ('NY', 'CA', 'IL', 'TX', 'FL', 'WA', 'MA')
+
+# Columns parsed as dates, returned at one resolution whichever file was read
+_DATE_COLUMNS = ['order_date', 'ship_date']
+_DATE_UNIT = 'ns'
+
+# Low-cardinality sample columns stored as categories
+_CATEGORY_COLUMNS = (
+    'customer_segment', 'product_category', 'payment_method', 'shipping_method',
+    'status', 'city', 'state', 'country'
+)
+
 logger = logging.getLogger(__name__)
 
 class CSVExtractor:
@@ -24,6 +71,9 @@ class CSVExtractor:
         """
         self.config = config
         self.source_file = config.orders_csv
+        
+        # Typed Parquet copy written alongside generated sample data
+        self.parquet_file = os.path.splitext(self.source_file)[0] + '.parquet'
     
     def extract(self, start_date=None, end_date=None, product_category=None, customer_segment=None):
         """
@@ -49,26 +99,46 @@ class CSVExtractor:
             logger.warning(f"CSV file not found: {self.source_file}. Creating sample data.")
             self._create_sample_data()
         
+        # Collect the requested filters as (column, op, value) triples
+        filters = []
+        
+        # Apply date filtering if provided
+        if start_date:
+            filters.append(('order_date', '>=', pd.to_datetime(start_date)))
+        
+        if end_date:
+            filters.append(('order_date', '<=', pd.to_datetime(end_date)))
+        
+        # Apply product category filtering if provided
+        if product_category:
+            filters.append(('product_category', '==', product_category))
+        
+        # Apply customer segment filtering if provided
+        if customer_segment:
+            filters.append(('customer_segment', '==', customer_segment))
+        
         try:
-            # Read CSV file
-            df = pd.read_csv(self.source_file, parse_dates=['order_date', 'ship_date'])
-            
-            # Apply date filtering if provided
-            if start_date:
-                start_date = pd.to_datetime(start_date)
-                df = df[df['order_date'] >= start_date]
-            
-            if end_date:
-                end_date = pd.to_datetime(end_date)
-                df = df[df['order_date'] <= end_date]
-            
-            # Apply product category filtering if provided
-            if product_category:
-                df = df[df['product_category'] == product_category]
+            if self._parquet_is_current():
+                # Read the typed Parquet copy, pushing the filters into the reader
+                df = pd.read_parquet(self.parquet_file, filters=filters or None)
+            else:
+                # Read CSV file
+                df = pd.read_csv(self.source_file, parse_dates=_DATE_COLUMNS, engine=_CSV_ENGINE)
+                
+                # Combine all requested filters into one mask and slice once
+                mask = pd.Series(True, index=df.index)
+                for column, op, value in filters:
+                    mask &= _FILTER_OPS[op](df[column], value)
+                
+                if not mask.all():
+                    df = df[mask]
             
-            # Apply customer segment filtering if provided
-            if customer_segment:
-                df = df[df['customer_segment'] == customer_segment]
+            # Return the same frame whichever file was read: filtered rows are
+            # renumbered, as the Parquet reader does, and dates share one unit
+            df = df.reset_index(drop=True)
+            for column in _DATE_COLUMNS:
+                if column in df.columns and pd.api.types.is_datetime64_any_dtype(df[column]):
+                    df[column] = df[column].dt.as_unit(_DATE_UNIT)
             
             # Basic info about the extracted data
             logger.info(f"Extracted {len(df)} rows from CSV file")
@@ -82,6 +152,37 @@ class CSVExtractor:
             logger.error(f"Error extracting data from CSV file: {str(e)}")
             raise
     
+    def _parquet_is_current(self):
+        """
+        Check whether a Parquet copy of the source CSV can be read instead.
+        
+        The copy records the size and modification time of the CSV it was
+        written from, and is only used while both still match.
+        
+        Returns:
+            bool: True if the Parquet file exists and was written from the current CSV
+        """
+        if not _HAS_PYARROW or not os.path.exists(self.parquet_file):
+            return False
+        try:
+            metadata = pq.read_schema(self.parquet_file).metadata or {}
+        except (OSError, ValueError):
+            return False
+        return all(metadata.get(key) == value for key, value in self._source_stamp().items())
+    
+    def _source_stamp(self):
+        """
+        Describe the current source CSV for the Parquet copy's metadata.
+        
+        Returns:
+            dict: Size and modification time of the CSV as Parquet metadata entries
+        """
+        stat = os.stat(self.source_file)
+        return {
+            b'source_size': str(stat.st_size).encode(),
+            b'source_mtime_ns': str(stat.st_mtime_ns).encode()
+        }
+    
     def _create_sample_data(self):
         """Create sample e-commerce sales data for demonstration purposes."""
         import numpy as np
@@ -91,96 +192,60 @@ class CSVExtractor:
         start_date = end_date - pd.Timedelta(days=90)
         dates = pd.date_range(start=start_date, end=end_date, freq='D')
         
-        # Sample product categories and names
-        product_categories = ['Electronics', 'Clothing', 'Home & Kitchen', 'Books', 'Toys']
-        product_names = {
-            'Electronics': ['Smartphone', 'Laptop', 'Headphones', 'Tablet', 'Smart Watch'],
-            'Clothing': ['T-shirt', 'Jeans', 'Dress', 'Jacket', 'Socks'],
-            'Home & Kitchen': ['Blender', 'Coffee Maker', 'Toaster', 'Cookware Set', 'Knife Set'],
-            'Books': ['Fiction Novel', 'Cookbook', 'Biography', 'Self-Help Book', 'Children Book'],
-            'Toys': ['Action Figure', 'Board Game', 'Puzzle', 'Stuffed Animal', 'Building Blocks']
-        }
-        
-        # Customer segments
-        customer_segments = ['New', 'Regular', 'VIP', 'Inactive', 'Wholesale']
+        # Generate 500 orders, drawing each column in one batch rather than
+        # looping over orders and drawing scalars per row
+        rng = np.random.default_rng()
+        n_orders = 500
+        order_dates = rng.choice(dates, size=n_orders)
+        ship_dates = order_dates + pd.to_timedelta(rng.integers(1, 7, size=n_orders), unit='D')
         
-        # Payment methods
-        payment_methods = ['Credit Card', 'PayPal', 'Bank Transfer', 'Cash on Delivery', 'Gift Card']
+        # Select random product category and a name within that category
+        category_idx = rng.integers(0, len(_PRODUCT_CATEGORIES), size=n_orders)
+        name_idx = rng.integers(0, len(_PRODUCT_NAMES[0]), size=n_orders)
         
-        # Shipping methods
-        shipping_methods = ['Standard', 'Express', 'Next Day', 'International', 'Local Pickup']
+        # Generate random quantities and prices
+        quantity = rng.integers(1, 5, size=n_orders)
+        unit_price = np.round(rng.uniform(5, 200, size=n_orders), 2)
+        total_price = np.round(quantity * unit_price, 2)
+        discount = np.round(rng.uniform(0, 0.2, size=n_orders) * total_price, 2)
         
-        # Create empty list to store data
-        data = []
+        # Add taxes and shipping
+        tax_rate = 0.08
+        tax_amount = np.round(tax_rate * (total_price - discount), 2)
+        shipping_cost = np.round(rng.uniform(3, 15, size=n_orders), 2)
+        final_price = np.round(total_price - discount + tax_amount + shipping_cost, 2)
         
-        # Generate random order data
-        order_id = 10000
-        for _ in range(500):  # Generate 500 orders
-            order_date = np.random.choice(dates)
-            ship_date = order_date + pd.Timedelta(days=np.random.randint(1, 7))
-            
-            # Select random product category and name
-            category = np.random.choice(product_categories)
-            product_name = np.random.choice(product_names[category])
-            
-            # Generate random quantities and prices
-            quantity = np.random.randint(1, 5)
-            unit_price = round(np.random.uniform(5, 200), 2)
-            total_price = round(quantity * unit_price, 2)
-            discount = round(np.random.uniform(0, 0.2) * total_price, 2)
-            
-            # Add taxes and shipping
-            tax_rate = 0.08
-            tax_amount = round(tax_rate * (total_price - discount), 2)
-            shipping_cost = round(np.random.uniform(3, 15), 2)
-            final_price = round(total_price - discount + tax_amount + shipping_cost, 2)
-            
-            # Customer info
-            customer_id = np.random.randint(1000, 10000)
-            customer_segment = np.random.choice(customer_segments)
-            city = np.random.choice(['New York', 'Los Angeles', 'Chicago', 'Houston', 'Miami', 'Seattle', 'Boston'])
-            state = np.random.choice(['NY', 'CA', 'IL', 'TX', 'FL', 'WA', 'MA'])
-            country = 'USA'
-            
-            # Order status
-            if ship_date > datetime.now():
-                status = np.random.choice(['Pending', 'Processing'])
-            else:
-                status = np.random.choice(['Shipped', 'Delivered', 'Returned'], p=[0.3, 0.6, 0.1])
-            
-            # Payment and shipping
-            payment_method = np.random.choice(payment_methods)
-            shipping_method = np.random.choice(shipping_methods)
-            
-            # Add to data list
-            data.append({
-                'order_id': order_id,
-                'order_date': order_date,
-                'ship_date': ship_date,
-                'customer_id': customer_id,
-                'customer_segment': customer_segment,
-                'product_id': np.random.randint(100, 1000),
-                'product_name': product_name,
-                'product_category': category,
-                'quantity': quantity,
-                'unit_price': unit_price,
-                'total_price': total_price,
-                'discount': discount,
-                'tax': tax_amount,
-                'shipping_cost': shipping_cost,
-                'final_price': final_price,
-                'payment_method': payment_method,
-                'shipping_method': shipping_method,
-                'status': status,
-                'city': city,
-                'state': state,
-                'country': country
-            })
-            
-            order_id += 1
+        # Order status depends on whether the order has shipped yet
+        status = np.where(
+            ship_dates > datetime.now(),
+            rng.choice(['Pending', 'Processing'], size=n_orders),
+            rng.choice(['Shipped', 'Delivered', 'Returned'], size=n_orders, p=[0.3, 0.6, 0.1])
+        )
         
         # Create DataFrame
-        df = pd.DataFrame(data)
+        df = pd.DataFrame({
+            'order_id': np.arange(10000, 10000 + n_orders),
+            'order_date': order_dates,
+            'ship_date': ship_dates,
+            'customer_id': rng.integers(1000, 10000, size=n_orders),
+            'customer_segment': rng.choice(_CUSTOMER_SEGMENTS, size=n_orders),
+            'product_id': rng.integers(100, 1000, size=n_orders),
+            'product_name': np.array(_PRODUCT_NAMES)[category_idx, name_idx],
+            'product_category': np.array(_PRODUCT_CATEGORIES)[category_idx],
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'total_price': total_price,
+            'discount': discount,
+            'tax': tax_amount,
+            'shipping_cost': shipping_cost,
+            'final_price': final_price,
+            'payment_method': rng.choice(_PAYMENT_METHODS, size=n_orders),
+            'shipping_method': rng.choice(_SHIPPING_METHODS, size=n_orders),
+            'status': status,
+            'city': rng.choice(_CITIES, size=n_orders),
+            'state': rng.choice(_STATES, size=n_orders),
+            'country': 'USA'
+        }).astype({column: 'category' for column in _CATEGORY_COLUMNS})
         
         # Ensure the directory exists
         os.makedirs(os.path.dirname(self.source_file), exist_ok=True)
@@ -188,3 +253,9 @@ class CSVExtractor:
         # Save to CSV
         df.to_csv(self.source_file, index=False)
         logger.info(f"Created sample e-commerce sales data: {self.source_file}")
+        
+        # Also keep a typed Parquet copy so later extracts skip CSV parsing
+        if _HAS_PYARROW:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata({**table.schema.metadata, **self._source_stamp()})
+            pq.write_table(table, self.parquet_file, compression='zstd')
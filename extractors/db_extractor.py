@@ -9,10 +9,18 @@ import logging
 import pandas as pd
 import os
 import sqlite3
+import queue
+import threading
 from datetime import datetime
 
+from config import ensure_dir
+
 logger = logging.getLogger(__name__)
 
+# Idle read connections per database path, shared by all extractor instances
+_READ_POOLS = {}
+_READ_POOLS_LOCK = threading.Lock()
+
 class DBExtractor:
     """Extracts e-commerce data from SQLite database."""
     
@@ -25,15 +33,103 @@ class DBExtractor:
         """
         self.config = config
         self.db_path = config.historical_db
+        self.read_pool_size = config.db_read_pool_size
+    
+    def _read_pool(self):
+        """
+        Get the pool of idle read connections for this database.
+        
+        Returns:
+            queue.Queue: Idle connections, bounded by the read pool size
+        """
+        with _READ_POOLS_LOCK:
+            pool = _READ_POOLS.get(self.db_path)
+            if pool is None:
+                pool = _READ_POOLS[self.db_path] = queue.Queue(maxsize=self.read_pool_size)
+            return pool
+    
+    def _acquire(self):
+        """
+        Take a read connection from the pool, opening one if none is idle.
+        
+        Returns:
+            sqlite3.Connection: Database connection
+        """
+        try:
+            return self._read_pool().get_nowait()
+        except queue.Empty:
+            return self._connect()
+    
+    def _release(self, conn):
+        """
+        Return a read connection to the pool, closing it if the pool is full.
+        
+        Args:
+            conn (sqlite3.Connection): Connection obtained from _acquire()
+        """
+        try:
+            self._read_pool().put_nowait(conn)
+        except queue.Full:
+            conn.close()
+    
+    def _close_pool(self):
+        """Close all idle read connections for this database."""
+        pool = self._read_pool()
+        while True:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                break
     
-    def extract(self, start_date=None, end_date=None, query=None):
+    def _connect(self, writing=False):
+        """
+        Open a connection to the SQLite database with tuned PRAGMAs.
+        
+        PRAGMAs are applied once here; read connections then live in the
+        pool and are reused across calls, possibly from other threads.
+        
+        Args:
+            writing (bool, optional): Whether the connection is used for bulk writes
+        
+        Returns:
+            sqlite3.Connection: Database connection
+        """
+        # connect() creates a missing database file, but not its directory
+        if self.db_path != ':memory:':
+            ensure_dir(os.path.dirname(os.path.abspath(self.db_path)))
+        
+        # Autocommit mode: reads never hold an implicit transaction open and
+        # writers delimit their own transactions explicitly
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=writing)
+        
+        # WAL lets readers run alongside a writer and makes NORMAL sync safe;
+        # neither applies to an in-memory database
+        if self.db_path != ':memory:':
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+        
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-65536')  # 64 MB page cache
+        conn.execute('PRAGMA busy_timeout=5000')  # Wait up to 5s for locks
+        
+        # Memory-map the file for read scans to skip copying pages into the pager
+        if not writing:
+            conn.execute('PRAGMA mmap_size=268435456')  # 256 MB
+        return conn
+    
+    def extract(self, start_date=None, end_date=None, query=None, chunksize=50000):
         """
         Extract data from SQLite database with optional filtering.
         
+        Results are read in chunks and combined, so peak memory while
+        building the DataFrame grows with chunksize rather than with the
+        size of the whole result set.
+        
         Args:
             start_date (str, optional): Start date for filtering in YYYY-MM-DD format
             end_date (str, optional): End date for filtering in YYYY-MM-DD format
             query (str, optional): Custom SQL query to execute
+            chunksize (int, optional): Number of rows fetched per chunk
         
         Returns:
             pandas.DataFrame: Extracted data
@@ -43,20 +139,20 @@ class DBExtractor:
         """
         logger.info(f"Extracting data from SQLite database: {self.db_path}")
         
-        # Check if database exists
-        if not os.path.exists(self.db_path):
-            # If the database doesn't exist, create a sample database for demo purposes
-            logger.warning(f"SQLite database not found: {self.db_path}. Creating sample data.")
-            self._create_sample_data()
+        try:
+            # Borrow a pooled connection to the SQLite database
+            conn = self._acquire()
+        except Exception as e:
+            logger.error(f"Error extracting data from database: {str(e)}")
+            raise
         
         try:
-            # Connect to SQLite database
-            conn = sqlite3.connect(self.db_path)
+            self._ensure_sample_data(conn)
             
             # Execute query based on parameters
             if query:
                 logger.info(f"Executing custom query: {query}")
-                df = pd.read_sql(query, conn)
+                df = pd.concat(pd.read_sql(query, conn, chunksize=chunksize), ignore_index=True)
             else:
                 # Build SQL query with date filters
                 sql = "SELECT * FROM historical_sales"
@@ -76,71 +172,122 @@ class DBExtractor:
                     params.append(end_date)
                 
                 logger.info(f"Executing query: {sql} with params: {params}")
-                df = pd.read_sql(sql, conn, params=params)
+                if logger.isEnabledFor(logging.DEBUG):
+                    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+                    logger.debug(f"Query plan: {[step[-1] for step in plan]}")
+                df = pd.concat(pd.read_sql(sql, conn, params=params, chunksize=chunksize), ignore_index=True)
             
             # Basic info about the extracted data
             logger.info(f"Extracted {len(df)} rows from database")
             if not df.empty:
                 logger.info(f"Columns in database data: {', '.join(df.columns)}")
             
-            # Close connection
-            conn.close()
-            
             return df
             
         except Exception as e:
             logger.error(f"Error extracting data from database: {str(e)}")
             raise
+        
+        finally:
+            # Return the connection to the pool for the next call
+            self._release(conn)
     
-    def extract_all_tables(self):
+    def extract_all_tables(self, chunksize=50000):
         """
-        Extract data from all tables in the database.
+        Extract data from all user tables in the database.
+        
+        SQLite's internal tables (sqlite_sequence, sqlite_stat1, ...) are
+        skipped, and each table is read in chunks like extract().
+        
+        Args:
+            chunksize (int, optional): Number of rows fetched per chunk
         
         Returns:
             dict: Dictionary with table names as keys and DataFrames as values
         """
         logger.info("Extracting all tables from database")
         
-        # Check if database exists
-        if not os.path.exists(self.db_path):
-            # If the database doesn't exist, create a sample database for demo purposes
-            logger.warning(f"SQLite database not found: {self.db_path}. Creating sample data.")
-            self._create_sample_data()
+        try:
+            # Borrow a pooled connection to the SQLite database
+            conn = self._acquire()
+        except Exception as e:
+            logger.error(f"Error extracting all tables from database: {str(e)}")
+            raise
         
         try:
-            # Connect to SQLite database
-            conn = sqlite3.connect(self.db_path)
+            self._ensure_sample_data(conn)
             
-            # Get all table names
+            # Get all user table names
             cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\';")
             tables = [table[0] for table in cursor.fetchall()]
             
             # Extract data from each table
             data = {}
             for table in tables:
                 logger.info(f"Extracting data from table: {table}")
-                data[table] = pd.read_sql(f"SELECT * FROM {table}", conn)
+                data[table] = pd.concat(pd.read_sql(f'SELECT * FROM "{table}"', conn, chunksize=chunksize), ignore_index=True)
                 logger.info(f"Extracted {len(data[table])} rows from table {table}")
             
-            # Close connection
-            conn.close()
-            
             return data
             
         except Exception as e:
             logger.error(f"Error extracting all tables from database: {str(e)}")
             raise
+        
+        finally:
+            # Return the connection to the pool for the next call
+            self._release(conn)
+    
+    def _ensure_sample_data(self, conn):
+        """
+        Create the sample database if the database has no schema at all.
+        
+        Connecting to a missing database file creates an empty one, so an
+        empty sqlite_master means the file was missing or empty. A database
+        that already holds any table or other object is never seeded, so
+        existing user tables are never replaced.
+        
+        Args:
+            conn (sqlite3.Connection): Database connection
+        """
+        found = conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone()
+        if found is None:
+            # If the database is missing or empty, create sample data for demo purposes
+            logger.warning(f"SQLite database not found or empty: {self.db_path}. Creating sample data.")
+            self._create_sample_data(conn)
     
-    def _create_sample_data(self):
-        """Create sample e-commerce historical sales data in SQLite database."""
+    def _write_table(self, conn, table, df):
+        """
+        Replace a table with the rows of a DataFrame in one executemany call.
+        
+        The caller owns the transaction, so several tables can be written
+        and committed together.
+        
+        Args:
+            conn (sqlite3.Connection): Database connection
+            table (str): Name of the table to replace
+            df (pandas.DataFrame): Rows to insert
+        """
+        conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        conn.execute(pd.io.sql.get_schema(df, table, con=conn))
+        
+        placeholders = ', '.join(['?'] * len(df.columns))
+        conn.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})', df.itertuples(index=False, name=None))
+    
+    def _create_sample_data(self, conn=None):
+        """
+        Create sample e-commerce historical sales data in SQLite database.
+        
+        Args:
+            conn (sqlite3.Connection, optional): Connection to write through;
+                                                 a dedicated writer is opened
+                                                 and closed if not given
+        """
         import numpy as np
         
         logger.info(f"Creating sample database: {self.db_path}")
         
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        
         # Generate dates for the past 2 years
         end_date = datetime.now()
         start_date = end_date - pd.Timedelta(days=730)  # ~2 years
@@ -152,105 +299,99 @@ class DBExtractor:
         # Customer segments
         customer_segments = ['New', 'Regular', 'VIP', 'Inactive', 'Wholesale']
         
-        # Create empty list to store data
-        historical_sales = []
-        transactions = []
-        customers = []
-        
-        # Generate random historical sales data
-        order_id = 1000
-        for _ in range(1000):  # Generate 1000 historical orders
-            order_date_np = np.random.choice(dates)
-            # Convert numpy.datetime64 to Python datetime via pandas Timestamp
-            order_date = pd.Timestamp(order_date_np).to_pydatetime()
-            # More recent dates should be more common
-            days_ago = (end_date - order_date).days
-            if np.random.random() > days_ago / 730:  # Probability decreases with age
-                continue
-                
-            category = np.random.choice(product_categories)
-            
-            # Generate random quantities and prices
-            quantity = np.random.randint(1, 10)
-            unit_price = round(np.random.uniform(5, 200), 2)
-            total_price = round(quantity * unit_price, 2)
-            
-            # Customer info
-            customer_id = np.random.randint(1000, 2000)
-            customer_segment = np.random.choice(customer_segments)
-            
-            # Add to historical sales data
-            historical_sales.append({
-                'order_id': order_id,
-                'order_date': order_date.strftime('%Y-%m-%d'),
-                'customer_id': customer_id,
-                'customer_segment': customer_segment,
-                'product_category': category,
-                'quantity': quantity,
-                'unit_price': unit_price,
-                'total_price': total_price
-            })
-            
-            # Add transaction data
-            payment_status = np.random.choice(['Paid', 'Pending', 'Failed', 'Refunded'], p=[0.85, 0.1, 0.03, 0.02])
-            payment_method = np.random.choice(['Credit Card', 'PayPal', 'Bank Transfer', 'Cash on Delivery', 'Gift Card'])
-            
-            transactions.append({
-                'transaction_id': f"TRANS-{order_id}",
-                'order_id': order_id,
-                'transaction_date': (order_date + pd.Timedelta(days=np.random.randint(0, 2))).strftime('%Y-%m-%d'),
-                'amount': total_price,
-                'payment_method': payment_method,
-                'status': payment_status
-            })
-            
-            order_id += 1
+        rng = np.random.default_rng()
+        
+        # Generate random historical sales data, drawing each column in one batch
+        order_dates = pd.DatetimeIndex(rng.choice(dates, size=1000))  # 1000 candidate orders
+        
+        # More recent dates should be more common
+        days_ago = (end_date - order_dates).days.to_numpy()
+        order_dates = order_dates[rng.random(1000) <= days_ago / 730]  # Probability decreases with age
+        n_orders = len(order_dates)
+        
+        order_ids = np.arange(1000, 1000 + n_orders)
+        
+        # Generate random quantities and prices
+        quantity = rng.integers(1, 10, size=n_orders)
+        unit_price = np.round(rng.uniform(5, 200, size=n_orders), 2)
+        total_price = np.round(quantity * unit_price, 2)
+        
+        df_sales = pd.DataFrame({
+            'order_id': order_ids,
+            'order_date': order_dates.strftime('%Y-%m-%d'),
+            'customer_id': rng.integers(1000, 2000, size=n_orders),
+            'customer_segment': rng.choice(customer_segments, size=n_orders),
+            'product_category': rng.choice(product_categories, size=n_orders),
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'total_price': total_price
+        })
+        
+        # Add transaction data
+        transaction_dates = order_dates + pd.to_timedelta(rng.integers(0, 2, size=n_orders), unit='D')
+        
+        df_transactions = pd.DataFrame({
+            'transaction_id': np.char.add('TRANS-', order_ids.astype(str)),
+            'order_id': order_ids,
+            'transaction_date': transaction_dates.strftime('%Y-%m-%d'),
+            'amount': total_price,
+            'payment_method': rng.choice(['Credit Card', 'PayPal', 'Bank Transfer', 'Cash on Delivery', 'Gift Card'], size=n_orders),
+            'status': rng.choice(['Paid', 'Pending', 'Failed', 'Refunded'], size=n_orders, p=[0.85, 0.1, 0.03, 0.02])
+        })
         
         # Generate customer data
-        for customer_id in range(1000, 2000):
-            if customer_id % 10 == 0:  # Only create records for some customers
-                continue
-                
-            registration_date_np = np.random.choice(dates)
-            registration_date = pd.Timestamp(registration_date_np).to_pydatetime()
-            last_purchase_date = registration_date + pd.Timedelta(days=np.random.randint(1, 365))
-            if last_purchase_date > end_date:
-                last_purchase_date = registration_date
+        customer_ids = np.arange(1000, 2000)
+        customer_ids = customer_ids[customer_ids % 10 != 0]  # Only create records for some customers
+        n_customers = len(customer_ids)
+        
+        registration_dates = pd.DatetimeIndex(rng.choice(dates, size=n_customers))
+        last_purchase_dates = registration_dates + pd.to_timedelta(rng.integers(1, 365, size=n_customers), unit='D')
+        last_purchase_dates = last_purchase_dates.where(last_purchase_dates <= end_date, registration_dates)
+        
+        customer_str = customer_ids.astype(str)
+        phone_prefix = np.char.add('555-', rng.integers(100, 999, size=n_customers).astype(str))
+        phone_suffix = np.char.add('-', rng.integers(1000, 9999, size=n_customers).astype(str))
+        
+        df_customers = pd.DataFrame({
+            'customer_id': customer_ids,
+            'name': np.char.add('Customer ', customer_str),
+            'email': np.char.add(np.char.add('customer', customer_str), '@example.com'),
+            'phone': np.char.add(phone_prefix, phone_suffix),
+            'registration_date': registration_dates.strftime('%Y-%m-%d'),
+            'last_purchase_date': last_purchase_dates.strftime('%Y-%m-%d'),
+            'total_purchases': rng.integers(1, 50, size=n_customers),
+            'total_spent': np.round(rng.uniform(50, 5000, size=n_customers), 2),
+            'segment': rng.choice(customer_segments, size=n_customers)
+        })
+        
+        # Pooled readers may still point at a database file that has been removed
+        self._close_pool()
+        
+        # Connect to SQLite database and create tables, through a dedicated
+        # writer unless the caller passed its connection
+        own_connection = conn is None
+        if own_connection:
+            conn = self._connect(writing=True)
+        
+        # Create tables, insert data and build indexes in a single transaction
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            self._write_table(conn, 'historical_sales', df_sales)
+            self._write_table(conn, 'transactions', df_transactions)
+            self._write_table(conn, 'customers', df_customers)
+            
+            # Create some indexes for better performance, after the inserts so each is built once
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_sales_order_id ON historical_sales (order_id);')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_sales_customer_id ON historical_sales (customer_id);')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_sales_order_date ON historical_sales (order_date);')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_trans_order_id ON transactions (order_id);')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_customers_id ON customers (customer_id);')
             
-            customers.append({
-                'customer_id': customer_id,
-                'name': f"Customer {customer_id}",
-                'email': f"customer{customer_id}@example.com",
-                'phone': f"555-{np.random.randint(100, 999)}-{np.random.randint(1000, 9999)}",
-                'registration_date': registration_date.strftime('%Y-%m-%d'),
-                'last_purchase_date': last_purchase_date.strftime('%Y-%m-%d'),
-                'total_purchases': np.random.randint(1, 50),
-                'total_spent': round(np.random.uniform(50, 5000), 2),
-                'segment': np.random.choice(customer_segments)
-            })
-        
-        # Convert to DataFrames
-        df_sales = pd.DataFrame(historical_sales)
-        df_transactions = pd.DataFrame(transactions)
-        df_customers = pd.DataFrame(customers)
-        
-        # Connect to SQLite database and create tables
-        conn = sqlite3.connect(self.db_path)
-        
-        # Create tables and insert data
-        df_sales.to_sql('historical_sales', conn, index=False, if_exists='replace')
-        df_transactions.to_sql('transactions', conn, index=False, if_exists='replace')
-        df_customers.to_sql('customers', conn, index=False, if_exists='replace')
-        
-        # Create some indexes for better performance
-        conn.execute('CREATE INDEX IF NOT EXISTS idx_sales_order_id ON historical_sales (order_id);')
-        conn.execute('CREATE INDEX IF NOT EXISTS idx_sales_customer_id ON historical_sales (customer_id);')
-        conn.execute('CREATE INDEX IF NOT EXISTS idx_sales_order_date ON historical_sales (order_date);')
-        conn.execute('CREATE INDEX IF NOT EXISTS idx_trans_order_id ON transactions (order_id);')
-        conn.execute('CREATE INDEX IF NOT EXISTS idx_customers_id ON customers (customer_id);')
-        
-        # Commit and close connection
-        conn.commit()
-        conn.close()
+            # Gather statistics so the planner picks the date index for range filters
+            conn.execute('ANALYZE;')
+        
+        # Close connection
+        if own_connection:
+            conn.close()
         
         logger.info(f"Created sample historical sales database with {len(df_sales)} sales records, {len(df_transactions)} transactions, and {len(df_customers)} customers")
@@ -8,12 +8,43 @@ Email Extractor module for extracting e-commerce data from email messages.
 import logging
 import pandas as pd
 import os
+import io
 import re
 import email
+import email.policy
 import imaplib
 from datetime import datetime
 import tempfile
-from email.utils import parsedate_to_datetime
+
+try:
+    import pyarrow
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
+# Multi-threaded parser for CSV attachments when pyarrow is installed
+_CSV_ENGINE = 'pyarrow' if _HAS_PYARROW else 'c'
+
+# Patterns for pulling order and shipping details out of email bodies
+_ORDER_ID_RE = re.compile(r'order\s*(?:number|#|id)?\s*[:#]?\s*(\w+[-\w]*)', re.IGNORECASE)
+_PRODUCT_RE = re.compile(r'(\d+)\s*x\s*([\w\s\-\&]+?)\s*\$?(\d+\.\d{2})')  # quantity x name price
+_TRACKING_RE = re.compile(r'tracking\s*(?:number|#|id)?\s*[:#]?\s*(\w+[-\w]*)', re.IGNORECASE)
+_CARRIER_RE = re.compile(r'(?:shipped|carrier|shipping)\s*(?:via|with|using)?\s*[:#]?\s*([\w\s]+)', re.IGNORECASE)
+
+# Messages requested per IMAP FETCH command
+FETCH_BATCH_SIZE = 100
+
+# Subject keywords and the kind of email they identify, checked in order
+_SUBJECT_CLASSIFIERS = (
+    ('order confirmation', 'order'),
+    ('your order', 'order'),
+    ('shipping confirmation', 'shipping'),
+    ('shipped', 'shipping')
+)
+
+# Column layouts of the rows parsed from email bodies
+_PRODUCT_COLS = ('order_id', 'product_name', 'quantity', 'price', 'total', 'order_date', 'source_email')
+_SHIPPING_COLS = ('order_id', 'tracking_number', 'carrier', 'ship_date', 'source_email', 'status')
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +63,7 @@ class EmailExtractor:
         self.email_user = config.email_user
         self.email_password = config.email_password
         self.output_dir = os.path.join(config.data_dir, 'email')
+        self.archive_attachments = config.email_archive_attachments
     
     def extract(self, start_date=None, end_date=None, subject_pattern=None):
         """
@@ -97,74 +129,80 @@ class EmailExtractor:
             email_ids = data[0].split()
             logger.info(f"Found {len(email_ids)} matching emails")
             
-            # Extract data from emails
+            # Apply subject pattern filtering if not applied in search, reading
+            # only the Subject header so skipped emails are never downloaded
+            if subject_pattern and email_ids:
+                subject_re = re.compile(subject_pattern, re.IGNORECASE)
+                headers = self._fetch_messages(mail, email_ids, '(BODY.PEEK[HEADER.FIELDS (SUBJECT)])')
+                email_ids = [email_id for email_id, header in headers
+                             if subject_re.search(email.message_from_bytes(header, policy=email.policy.default).get('subject', ''))]
+                logger.info(f"{len(email_ids)} emails match subject pattern: {subject_pattern}")
+            
+            # Extract data from emails in message order; consecutive rows
+            # parsed from email bodies with the same column layout are
+            # collected as (columns, rows) and turned into one DataFrame later
             all_data = []
-            for email_id in email_ids:
-                result, data = mail.fetch(email_id, '(RFC822)')
-                raw_email = data[0][1]
-                
-                # Parse email
-                msg = email.message_from_bytes(raw_email)
-                subject = msg['subject']
+            
+            # BODY.PEEK[] returns the same bytes as RFC822 without setting \Seen
+            for _, raw_email in self._fetch_messages(mail, email_ids, '(BODY.PEEK[])'):
+                # Parse email; the default policy decodes headers and payloads
+                msg = email.message_from_bytes(raw_email, policy=email.policy.default)
+                subject = str(msg.get('subject', ''))
                 sender = msg['from']
-                date = parsedate_to_datetime(msg['date'])
+                date = msg['date'].datetime
                 
-                # Apply subject pattern filtering if not applied in search
-                if subject_pattern and not re.search(subject_pattern, subject, re.IGNORECASE):
-                    continue
-                
-                # Process email content
-                if msg.is_multipart():
-                    # Handle multipart emails
-                    for part in msg.walk():
-                        content_type = part.get_content_type()
-                        content_disposition = str(part.get("Content-Disposition"))
-                        
-                        # Extract attachments
-                        if "attachment" in content_disposition:
-                            filename = part.get_filename()
-                            if filename:
-                                # Save attachment
+                # Walk every part, including those nested in inner multiparts
+                # and attached messages
+                for part in msg.walk():
+                    # Extract attachments
+                    if part.is_attachment():
+                        filename = part.get_filename()
+                        if filename:
+                            payload = part.get_payload(decode=True)
+                            
+                            # Keep a copy under data/email unless archiving is turned off
+                            if self.archive_attachments:
                                 local_path = os.path.join(self.output_dir, filename)
                                 with open(local_path, 'wb') as f:
-                                    f.write(part.get_payload(decode=True))
-                                
-                                # Process attachment based on file type
-                                if filename.endswith('.csv'):
-                                    df = pd.read_csv(local_path)
-                                    df['source_email'] = subject
-                                    df['email_date'] = date
-                                    all_data.append(df)
-                                elif filename.endswith('.xlsx') or filename.endswith('.xls'):
-                                    df = pd.read_excel(local_path)
-                                    df['source_email'] = subject
-                                    df['email_date'] = date
-                                    all_data.append(df)
-                        
-                        # Extract text content
-                        elif content_type == "text/plain":
-                            body = part.get_payload(decode=True).decode()
+                                    f.write(payload)
                             
-                            # Try to extract structured data from text
-                            extracted = self._extract_data_from_text(body, subject, date)
-                            if extracted is not None:
-                                all_data.append(extracted)
-                else:
-                    # Handle non-multipart emails (text only)
-                    body = msg.get_payload(decode=True).decode()
+                            # Process attachment based on file type, straight from memory
+                            if filename.endswith('.csv'):
+                                df = pd.read_csv(io.BytesIO(payload), engine=_CSV_ENGINE)
+                                df['source_email'] = subject
+                                df['email_date'] = date
+                                all_data.append(df)
+                            elif filename.endswith('.xlsx') or filename.endswith('.xls'):
+                                df = pd.read_excel(io.BytesIO(payload))
+                                df['source_email'] = subject
+                                df['email_date'] = date
+                                all_data.append(df)
                     
-                    # Try to extract structured data from text
-                    extracted = self._extract_data_from_text(body, subject, date)
-                    if extracted is not None:
-                        all_data.append(extracted)
+                    # Extract text content from every plain-text part
+                    elif part.get_content_type() == 'text/plain':
+                        body = part.get_content()
+                        
+                        # Try to extract structured data from text
+                        columns, rows = self._extract_data_from_text(body, subject, date)
+                        if rows:
+                            if all_data and isinstance(all_data[-1], tuple) and all_data[-1][0] == columns:
+                                all_data[-1][1].extend(rows)
+                            else:
+                                all_data.append((columns, rows))
             
             # Close connection
             mail.close()
             mail.logout()
             
+            # Build one DataFrame per run of rows parsed from email bodies
+            all_data = [
+                pd.DataFrame.from_records(data[1], columns=list(data[0])) if isinstance(data, tuple) else data
+                for data in all_data
+            ]
+            
             # Combine all data
             if all_data:
-                combined_df = pd.concat(all_data, ignore_index=True)
+                combined_df = all_data[0] if len(all_data) == 1 else pd.concat(all_data, ignore_index=True)
                 logger.info(f"Extracted {len(combined_df)} rows from email server")
                 return combined_df
             else:
@@ -176,6 +214,30 @@ class EmailExtractor:
             logger.info("Falling back to mock data...")
             return self._mock_email_extraction(start_date, end_date, subject_pattern)
     
+    def _fetch_messages(self, mail, email_ids, message_parts):
+        """
+        Fetch messages in batches, one FETCH command per batch of IDs.
+        
+        Args:
+            mail (imaplib.IMAP4): Logged-in IMAP connection with a mailbox selected
+            email_ids (list): Message sequence numbers as bytes
+            message_parts (str): FETCH data items, e.g. '(BODY.PEEK[])'
+        
+        Yields:
+            tuple: Message sequence number (bytes) and the requested data,
+                   in server order
+        """
+        for start in range(0, len(email_ids), FETCH_BATCH_SIZE):
+            batch = email_ids[start:start + FETCH_BATCH_SIZE]
+            message_set = ','.join(email_id.decode() for email_id in batch)
+            result, data = mail.fetch(message_set, message_parts)
+            
+            # Each message arrives as an (envelope, payload) tuple followed by
+            # b')'; the envelope starts with the sequence number
+            for response in data:
+                if isinstance(response, tuple):
+                    yield response[0].split(None, 1)[0], response[1]
+    
     def _extract_data_from_text(self, text, subject, date):
         """
         Extract structured data from email text content.
@@ -186,64 +248,52 @@ class EmailExtractor:
             date (datetime): Email date
         
         Returns:
-            pandas.DataFrame: Extracted data or None if no data found
+            tuple: Column names and a list of row tuples; the list is empty
+                   if no data was found
         """
+        # Classify the email by the first subject keyword it contains
+        subject_lower = subject.lower() if subject else ''
+        kind = next((kind for keyword, kind in _SUBJECT_CLASSIFIERS if keyword in subject_lower), None)
+        
         # Look for common e-commerce patterns in the text
         
         # Check for order confirmation
-        if "order confirmation" in subject.lower() or "your order" in subject.lower():
+        if kind == 'order':
             # Try to extract order information
-            order_id_match = re.search(r'order\s*(?:number|#|id)?\s*[:#]?\s*(\w+[-\w]*)', text, re.IGNORECASE)
+            order_id_match = _ORDER_ID_RE.search(text)
             order_id = order_id_match.group(1) if order_id_match else None
             
             # Look for product information in the email
             products = []
             
-            # Pattern for product listings (name, quantity, price)
-            # This pattern will need to be adjusted based on actual email formats
-            product_pattern = r'(\d+)\s*x\s*([\w\s\-\&]+?)\s*\$?(\d+\.\d{2})'
-            for match in re.finditer(product_pattern, text):
+            # Product listings (name, quantity, price); _PRODUCT_RE will need
+            # to be adjusted based on actual email formats
+            for match in _PRODUCT_RE.finditer(text):
                 quantity = int(match.group(1))
                 product_name = match.group(2).strip()
                 price = float(match.group(3))
                 
-                products.append({
-                    'order_id': order_id,
-                    'product_name': product_name,
-                    'quantity': quantity,
-                    'price': price,
-                    'total': quantity * price,
-                    'order_date': date,
-                    'source_email': subject
-                })
+                products.append((order_id, product_name, quantity, price, quantity * price, date, subject))
             
-            if products:
-                return pd.DataFrame(products)
+            return _PRODUCT_COLS, products
         
         # Check for shipping confirmation
-        elif "shipping confirmation" in subject.lower() or "shipped" in subject.lower():
+        elif kind == 'shipping':
             # Try to extract shipping information
-            order_id_match = re.search(r'order\s*(?:number|#|id)?\s*[:#]?\s*(\w+[-\w]*)', text, re.IGNORECASE)
+            order_id_match = _ORDER_ID_RE.search(text)
             order_id = order_id_match.group(1) if order_id_match else None
             
-            tracking_match = re.search(r'tracking\s*(?:number|#|id)?\s*[:#]?\s*(\w+[-\w]*)', text, re.IGNORECASE)
+            tracking_match = _TRACKING_RE.search(text)
             tracking_number = tracking_match.group(1) if tracking_match else None
             
-            carrier_match = re.search(r'(?:shipped|carrier|shipping)\s*(?:via|with|using)?\s*[:#]?\s*([\w\s]+)', text, re.IGNORECASE)
+            carrier_match = _CARRIER_RE.search(text)
             carrier = carrier_match.group(1).strip() if carrier_match else None
             
             if order_id or tracking_number:
-                return pd.DataFrame([{
-                    'order_id': order_id,
-                    'tracking_number': tracking_number,
-                    'carrier': carrier,
-                    'ship_date': date,
-                    'source_email': subject,
-                    'status': 'Shipped'
-                }])
+                return _SHIPPING_COLS, [(order_id, tracking_number, carrier, date, subject, 'Shipped')]
         
         # No structured data found
-        return None
+        return None, []
     
     def _mock_email_extraction(self, start_date=None, end_date=None, subject_pattern=None):
         """
@@ -272,97 +322,92 @@ class EmailExtractor:
         # Generate dates within the range
         dates = pd.date_range(start=start_date_dt, end=end_date_dt, freq='D')
         
-        # Create empty list to store data
-        data = []
-        
         # Product categories
         categories = ['Electronics', 'Clothing', 'Home & Kitchen', 'Books', 'Toys']
         
-        # Email types
+        # Email types and the subject line around the order ID for each
         email_types = ['Order Confirmation', 'Shipping Confirmation', 'Delivery Confirmation', 'Return Confirmation']
+        subject_prefixes = np.array(['Your order ', 'Your order ', 'Your order ', 'Return for order '])
+        subject_suffixes = np.array([' has been confirmed', ' has shipped', ' has been delivered', ' confirmed'])
         
-        # Generate random email data
-        for date in dates:
-            # Number of emails on this day
-            num_emails = np.random.randint(1, 5)
-            
-            for _ in range(num_emails):
-                # Generate random order ID
-                order_id = f"ORD-{np.random.randint(100000, 999999)}"
-                
-                # Select random email type
-                email_type = np.random.choice(email_types, p=[0.4, 0.3, 0.2, 0.1])
-                
-                if email_type == 'Order Confirmation':
-                    subject = f"Your order {order_id} has been confirmed"
-                    
-                    # Generate order items
-                    num_items = np.random.randint(1, 4)
-                    for i in range(num_items):
-                        category = np.random.choice(categories)
-                        product_name = f"Sample {category} Product {i+1}"
-                        quantity = np.random.randint(1, 3)
-                        price = round(np.random.uniform(10, 200), 2)
-                        
-                        data.append({
-                            'order_id': order_id,
-                            'product_name': product_name,
-                            'product_category': category,
-                            'quantity': quantity,
-                            'price': price,
-                            'total': quantity * price,
-                            'order_date': pd.Timestamp(date).to_pydatetime(),
-                            'source_email': subject,
-                            'email_type': email_type,
-                            'status': 'Confirmed'
-                        })
-                
-                elif email_type == 'Shipping Confirmation':
-                    subject = f"Your order {order_id} has shipped"
-                    tracking_number = f"TRK-{np.random.randint(1000000, 9999999)}"
-                    carrier = np.random.choice(['USPS', 'FedEx', 'UPS', 'DHL'])
-                    
-                    data.append({
-                        'order_id': order_id,
-                        'tracking_number': tracking_number,
-                        'carrier': carrier,
-                        'ship_date': pd.Timestamp(date).to_pydatetime(),
-                        'source_email': subject,
-                        'email_type': email_type,
-                        'status': 'Shipped'
-                    })
-                
-                elif email_type == 'Delivery Confirmation':
-                    subject = f"Your order {order_id} has been delivered"
-                    delivery_date = date
-                    
-                    data.append({
-                        'order_id': order_id,
-                        'delivery_date': pd.Timestamp(delivery_date).to_pydatetime(),
-                        'source_email': subject,
-                        'email_type': email_type,
-                        'status': 'Delivered'
-                    })
-                
-                else:  # Return Confirmation
-                    subject = f"Return for order {order_id} confirmed"
-                    return_reason = np.random.choice(['Wrong size', 'Damaged', 'Not as described', 'Changed mind'])
-                    
-                    data.append({
-                        'order_id': order_id,
-                        'return_reason': return_reason,
-                        'return_date': pd.Timestamp(date).to_pydatetime(),
-                        'source_email': subject,
-                        'email_type': email_type,
-                        'status': 'Returned'
-                    })
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
-        
-        # Apply subject pattern filtering if provided
+        # Generate random email data, drawing each field for all emails at once
+        rng = np.random.default_rng()
+        emails_per_day = rng.integers(1, 5, size=len(dates))
+        email_dates = dates.repeat(emails_per_day)
+        n_emails = len(email_dates)
+        
+        order_ids = np.char.add('ORD-', rng.integers(100000, 999999, size=n_emails).astype(str))
+        email_type = rng.choice(len(email_types), size=n_emails, p=[0.4, 0.3, 0.2, 0.1])
+        subjects = np.char.add(np.char.add(subject_prefixes[email_type], order_ids), subject_suffixes[email_type])
+        
+        # Apply subject pattern filtering if provided, before any rows are built
         if subject_pattern:
-            df = df[df['source_email'].str.contains(subject_pattern, case=False)]
+            pattern = re.compile(subject_pattern, re.IGNORECASE)
+            keep = np.vectorize(lambda subject: pattern.search(subject) is not None, otypes=[bool])(subjects)
+            email_dates, order_ids, email_type, subjects = email_dates[keep], order_ids[keep], email_type[keep], subjects[keep]
+        
+        frames = []
+        
+        # Order confirmations list one row per ordered item
+        is_order = email_type == 0
+        num_items = rng.integers(1, 4, size=is_order.sum())
+        item_email = np.repeat(np.flatnonzero(is_order), num_items)
+        item_number = np.arange(len(item_email)) - np.repeat(np.cumsum(num_items) - num_items, num_items) + 1
+        item_category = rng.choice(categories, size=len(item_email))
+        quantity = rng.integers(1, 3, size=len(item_email))
+        price = np.round(rng.uniform(10, 200, size=len(item_email)), 2)
+        item_orders = order_ids[item_email]
+        
+        frames.append((item_email, pd.DataFrame({
+            'order_id': item_orders,
+            'product_name': np.char.add(np.char.add(np.char.add('Sample ', item_category), ' Product '), item_number.astype(str)),
+            'product_category': item_category,
+            'quantity': quantity,
+            'price': price,
+            'total': quantity * price,
+            'order_date': email_dates[item_email],
+            'source_email': subjects[item_email],
+            'email_type': email_types[0],
+            'status': 'Confirmed'
+        })))
+        
+        # Shipping confirmations
+        idx = np.flatnonzero(email_type == 1)
+        frames.append((idx, pd.DataFrame({
+            'order_id': order_ids[idx],
+            'tracking_number': np.char.add('TRK-', rng.integers(1000000, 9999999, size=len(idx)).astype(str)),
+            'carrier': rng.choice(['USPS', 'FedEx', 'UPS', 'DHL'], size=len(idx)),
+            'ship_date': email_dates[idx],
+            'source_email': subjects[idx],
+            'email_type': email_types[1],
+            'status': 'Shipped'
+        })))
+        
+        # Delivery confirmations
+        idx = np.flatnonzero(email_type == 2)
+        frames.append((idx, pd.DataFrame({
+            'order_id': order_ids[idx],
+            'delivery_date': email_dates[idx],
+            'source_email': subjects[idx],
+            'email_type': email_types[2],
+            'status': 'Delivered'
+        })))
+        
+        # Return confirmations
+        idx = np.flatnonzero(email_type == 3)
+        frames.append((idx, pd.DataFrame({
+            'order_id': order_ids[idx],
+            'return_reason': rng.choice(['Wrong size', 'Damaged', 'Not as described', 'Changed mind'], size=len(idx)),
+            'return_date': email_dates[idx],
+            'source_email': subjects[idx],
+            'email_type': email_types[3],
+            'status': 'Returned'
+        })))
+        
+        # Combine once and restore the order in which the emails arrived
+        email_index = np.concatenate([idx for idx, _ in frames])
+        df = pd.concat([frame for _, frame in frames], ignore_index=True)
+        df = df.iloc[np.argsort(email_index, kind='stable')].reset_index(drop=True)
         
         logger.info(f"Generated {len(df)} rows of mock email data")
         return df
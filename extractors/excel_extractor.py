@@ -8,11 +8,72 @@ Excel Extractor module for extracting e-commerce customer data from Excel files.
 import logging
 import pandas as pd
 import os
-from datetime import datetime
+from datetime import date, datetime
 import numpy as np
 
+try:
+    from python_calamine import CalamineWorkbook
+    _HAS_CALAMINE = True
+except ImportError:
+    _HAS_CALAMINE = False
+
 logger = logging.getLogger(__name__)
 
+def _default_sheet(sheet_names):
+    """Pick the 'Customers' sheet if present, otherwise the first sheet."""
+    logger.info(f"Available sheets: {', '.join(sheet_names)}")
+    return 'Customers' if 'Customers' in sheet_names else sheet_names[0]
+
+def _calamine_value(value):
+    """Convert a calamine cell value to what openpyxl would return for it."""
+    # calamine reports empty cells as '' and date-only cells as date
+    if isinstance(value, str):
+        return value if value else None
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+def _in_date_range(value, start, end):
+    """Check whether a cell value is a date between start and end (inclusive)."""
+    # openpyxl returns datetime objects for date cells; parse anything else
+    if not isinstance(value, datetime):
+        value = pd.to_datetime(value, errors='coerce')
+        if pd.isna(value):
+            return False
+    return (start is None or value >= start) and (end is None or value <= end)
+
+def _normalize_header(header):
+    """
+    Turn a raw header row into column names the way pd.read_excel does.
+    
+    Blank cells become 'Unnamed: <position>', every name is converted to a
+    string, and repeated names get '.1', '.2', ... suffixes.
+    
+    Args:
+        header (tuple): Cell values of the header row
+    
+    Returns:
+        list: Unique column names
+    """
+    names = [f"Unnamed: {i}" if value is None or value == '' else str(value) for i, value in enumerate(header)]
+    
+    # Same renaming scheme as pandas' Excel parser, skipping any suffixed
+    # name that is already taken in the header
+    counts = {}
+    for i, name in enumerate(names):
+        count = counts.get(name, 0)
+        new_name = name
+        while count > 0:
+            counts[name] = count + 1
+            new_name = f"{name}.{count}"
+            if new_name in names:
+                count += 1
+            else:
+                count = counts.get(new_name, 0)
+        names[i] = new_name
+        counts[new_name] = count + 1
+    return names
+
 class ExcelExtractor:
     """Extracts e-commerce customer data from Excel files."""
     
@@ -25,15 +86,24 @@ class ExcelExtractor:
         """
         self.config = config
         self.source_file = config.customers_excel
+        
+        # Set once the source file is known to exist, so later extracts skip the check
+        self._verified = False
     
-    def extract(self, start_date=None, end_date=None, sheet_name=None):
+    def extract(self, start_date=None, end_date=None, sheet_name=None, date_column=None, columns=None):
         """
         Extract data from Excel file with optional filtering.
         
+        When date_column is given, rows outside the date range are dropped
+        while the sheet is read instead of after the whole sheet is loaded.
+        Every column whose name contains 'date' is converted to datetime.
+        
         Args:
             start_date (str, optional): Start date for filtering in YYYY-MM-DD format
             end_date (str, optional): End date for filtering in YYYY-MM-DD format
             sheet_name (str, optional): Name of the Excel sheet to extract data from
+            date_column (str, optional): Name of the column to filter dates on
+            columns (list, optional): Columns to keep, in order; defaults to all columns
         
         Returns:
             pandas.DataFrame: Extracted data
@@ -44,69 +114,47 @@ class ExcelExtractor:
         logger.info(f"Extracting data from Excel file: {self.source_file}")
         
         # Check if file exists
-        if not os.path.exists(self.source_file):
+        if not self._verified and not os.path.exists(self.source_file):
             # If the file doesn't exist, create a sample file for demo purposes
             logger.warning(f"Excel file not found: {self.source_file}. Creating sample data.")
             self._create_sample_data()
         
         try:
-            # If sheet_name is provided, use it, otherwise read the first sheet
+            # Read the requested sheet, or pick one if sheet_name is not provided
             if sheet_name:
                 logger.info(f"Reading sheet: {sheet_name}")
-                df = pd.read_excel(self.source_file, sheet_name=sheet_name, engine='openpyxl')
+            
+            if date_column:
+                # Filter on the known date column while rows are streamed
+                df = self._read_sheet(sheet_name, date_column, start_date, end_date, columns)
             else:
-                # Get available sheet names
-                xlsx = pd.ExcelFile(self.source_file, engine='openpyxl')
-                sheet_names = xlsx.sheet_names
-                logger.info(f"Available sheets: {', '.join(sheet_names)}")
-                
-                # Read all sheets into a dictionary of dataframes
-                all_sheets = pd.read_excel(self.source_file, sheet_name=None, engine='openpyxl')
-                
-                # If there's only one sheet, return it
-                if len(all_sheets) == 1:
-                    df = list(all_sheets.values())[0]
-                else:
-                    # If there's a sheet named 'Customers', use it
-                    if 'Customers' in all_sheets:
-                        df = all_sheets['Customers']
-                    else:
-                        # Otherwise, use the first sheet
-                        df = list(all_sheets.values())[0]
-            
-            # Identify date columns
-            date_columns = []
+                df = self._read_sheet(sheet_name, columns=columns)
+            
+            # Identify date columns and convert them to datetime
             for col in df.columns:
-                if 'date' in str(col).lower():
-                    # Try to convert to datetime
+                if col == date_column or 'date' in str(col).lower():
                     try:
                         df[col] = pd.to_datetime(df[col], errors='coerce')
-                        date_columns.append(col)
-                    except:
+                    except (TypeError, ValueError):
                         pass
             
-            # Apply date filtering if provided
-            if start_date and date_columns:
-                start_date = pd.to_datetime(start_date)
-                for col in date_columns:
-                    # Create a temporary filter for each date column
-                    filter_condition = df[col] >= start_date
-                    # Apply filter only if any matches are found
-                    if filter_condition.any():
-                        df = df[filter_condition]
-                        logger.info(f"Applied start date filter on column {col}")
-                        break  # Only filter by one date column
-            
-            if end_date and date_columns:
-                end_date = pd.to_datetime(end_date)
-                for col in date_columns:
-                    # Create a temporary filter for each date column
-                    filter_condition = df[col] <= end_date
-                    # Apply filter only if any matches are found
-                    if filter_condition.any():
-                        df = df[filter_condition]
-                        logger.info(f"Applied end date filter on column {col}")
-                        break  # Only filter by one date column
+            if date_column:
+                if start_date or end_date:
+                    logger.info(f"Applied date filter on column {date_column}")
+            elif start_date or end_date:
+                # Only one date column is ever filtered on, so pick the first one by name
+                date_column = next((col for col in df.columns if 'date' in str(col).lower()), None)
+                
+                if date_column is not None:
+                    # Build one mask for both bounds; skip the copy when every row matches
+                    start = pd.to_datetime(start_date) if start_date else pd.Timestamp.min
+                    end = pd.to_datetime(end_date) if end_date else pd.Timestamp.max
+                    mask = df[date_column].between(start, end)
+                    if not mask.all():
+                        df = df.loc[mask]
+                    logger.info(f"Applied date filter on column {date_column}")
+            
+            self._verified = True
             
             # Basic info about the extracted data
             logger.info(f"Extracted {len(df)} rows from Excel file")
@@ -119,6 +167,93 @@ class ExcelExtractor:
             logger.error(f"Error extracting data from Excel file: {str(e)}")
             raise
     
+    def _read_sheet(self, sheet_name=None, date_column=None, start_date=None, end_date=None, columns=None):
+        """
+        Read one worksheet, with python-calamine if installed or openpyxl.
+        
+        Rows are streamed as plain values straight into the DataFrame,
+        skipping the per-cell conversion done by pd.read_excel. The first
+        row is used as the header, with names normalized as pd.read_excel
+        would. With a date_column and a date range, rows
+        outside the range are dropped as they are streamed. With columns,
+        only those columns are kept, so the date column may be left out.
+        
+        Args:
+            sheet_name (str, optional): Sheet to read; defaults to 'Customers' if
+                                        present, otherwise the first sheet
+            date_column (str, optional): Column holding the date to filter on
+            start_date (str, optional): Start date for filtering in YYYY-MM-DD format
+            end_date (str, optional): End date for filtering in YYYY-MM-DD format
+            columns (list, optional): Columns to keep, in order
+        
+        Returns:
+            pandas.DataFrame: Sheet data
+        """
+        rows = self._iter_rows(sheet_name)
+        try:
+            header = next(rows, None)
+            if header is None:
+                return pd.DataFrame()
+            header = _normalize_header(header)
+            
+            if date_column and (start_date or end_date):
+                if date_column not in header:
+                    raise ValueError(f"Date column not found in sheet: {date_column}")
+                index = header.index(date_column)
+                start = pd.to_datetime(start_date) if start_date else None
+                end = pd.to_datetime(end_date) if end_date else None
+                data = [row for row in rows if _in_date_range(row[index], start, end)]
+            else:
+                data = list(rows)
+        finally:
+            rows.close()
+        
+        # Drop trailing blank rows, as pd.read_excel does
+        while data and all(value is None for value in data[-1]):
+            data.pop()
+        
+        # Keep only the requested columns
+        if columns:
+            missing = [col for col in columns if col not in header]
+            if missing:
+                raise ValueError(f"Columns not found in sheet: {', '.join(missing)}")
+            indices = [header.index(col) for col in columns]
+            data = [[row[i] for i in indices] for row in data]
+            header = list(columns)
+        
+        return pd.DataFrame(data, columns=header)
+    
+    def _iter_rows(self, sheet_name=None):
+        """
+        Yield the rows of one worksheet as tuples of cell values.
+        
+        Uses the Rust-based python-calamine reader when it is installed and
+        falls back to openpyxl in read-only mode otherwise. Empty cells are
+        yielded as None with either reader.
+        
+        Args:
+            sheet_name (str, optional): Sheet to read; defaults to 'Customers' if
+                                        present, otherwise the first sheet
+        
+        Yields:
+            tuple: Cell values of one row
+        """
+        if _HAS_CALAMINE:
+            workbook = CalamineWorkbook.from_path(self.source_file)
+            sheet_name = sheet_name or _default_sheet(workbook.sheet_names)
+            for row in workbook.get_sheet_by_name(sheet_name).iter_rows():
+                yield tuple(_calamine_value(value) for value in row)
+            return
+        
+        import openpyxl
+        
+        workbook = openpyxl.load_workbook(self.source_file, read_only=True, data_only=True, keep_links=False)
+        try:
+            sheet_name = sheet_name or _default_sheet(workbook.sheetnames)
+            yield from workbook[sheet_name].iter_rows(values_only=True)
+        finally:
+            workbook.close()
+    
     def _create_sample_data(self):
         """Create sample e-commerce customer data in Excel format."""
         try:
@@ -128,9 +263,6 @@ class ExcelExtractor:
             # Ensure directory exists
             os.makedirs(os.path.dirname(self.source_file), exist_ok=True)
             
-            # Generate sample customer data
-            customers = []
-            
             # Generate random dates over the past 3 years
             end_date = datetime.now()
             start_date = end_date - pd.Timedelta(days=3*365)
@@ -144,219 +276,190 @@ class ExcelExtractor:
             countries = ['USA', 'Canada', 'UK', 'Australia', 'Germany', 'France', 'Japan', 'Mexico', 'Brazil']
             country_probs = [0.7, 0.05, 0.05, 0.03, 0.03, 0.03, 0.03, 0.04, 0.04]
             
-            # Generate customer data
-            for i in range(500):
-                customer_id = f"CUST-{1000 + i}"
-                email = f"customer_{1000 + i}@example.com"
-                
-                # Generate random name
-                first_names = ['John', 'Jane', 'Michael', 'Emily', 'David', 'Sarah', 'James', 'Jennifer', 'Robert', 'Lisa']
-                last_names = ['Smith', 'Johnson', 'Williams', 'Jones', 'Brown', 'Davis', 'Miller', 'Wilson', 'Moore', 'Taylor']
-                first_name = np.random.choice(first_names)
-                last_name = np.random.choice(last_names)
-                name = f"{first_name} {last_name}"
-                
-                # Use realistic phone number format
-                phone = f"({np.random.randint(100, 999)}) {np.random.randint(100, 999)}-{np.random.randint(1000, 9999)}"
-                
-                # Registration date and demographics
-                registration_date_np = registration_dates[i]
-                # Convert numpy.datetime64 to Python datetime via pandas Timestamp
-                registration_date = pd.Timestamp(registration_date_np).to_pydatetime()
-                segment = np.random.choice(segments, p=segment_probs)
-                country = np.random.choice(countries, p=country_probs)
-                
-                # Address information
-                if country == 'USA':
-                    states = ['CA', 'NY', 'TX', 'FL', 'IL', 'PA', 'OH', 'GA', 'NC', 'MI']
-                    state = np.random.choice(states)
-                    zip_code = f"{np.random.randint(10000, 99999)}"
-                else:
-                    state = ''
-                    zip_code = f"{np.random.randint(10000, 99999)}" if country in ['Canada', 'USA'] else f"{np.random.randint(10, 999)}-{np.random.randint(100, 9999)}"
-                
-                # Purchase history
-                total_orders = np.random.randint(0, 50) if segment != 'New' else 0
-                if segment == 'VIP':
-                    total_orders = np.random.randint(20, 100)
-                elif segment == 'Regular':
-                    total_orders = np.random.randint(5, 30)
-                elif segment == 'Inactive':
-                    total_orders = np.random.randint(1, 5)
-                elif segment == 'Wholesale':
-                    total_orders = np.random.randint(10, 50)
-                
-                # Calculate average order value based on segment
-                if segment == 'VIP':
-                    aov = np.random.uniform(100, 500)
-                elif segment == 'Regular':
-                    aov = np.random.uniform(50, 150)
-                elif segment == 'Inactive':
-                    aov = np.random.uniform(20, 80)
-                elif segment == 'Wholesale':
-                    aov = np.random.uniform(300, 1000)
-                else:  # New
-                    aov = 0
-                
-                total_spent = round(total_orders * aov, 2) if total_orders > 0 else 0
-                
-                # Last purchase date
-                if total_orders > 0:
-                    days_since_registration = (end_date - registration_date).days
-                    max_days = min(days_since_registration, 365)  # Cap at 1 year or registration period
-                    if segment == 'Inactive':
-                        # Inactive customers haven't purchased recently
-                        last_purchase_days_ago = np.random.randint(180, max(max_days, 181))
-                    else:
-                        # More recent purchases for active customers
-                        last_purchase_days_ago = np.random.randint(1, min(90, max_days))
-                    
-                    last_purchase_date = end_date - pd.Timedelta(days=last_purchase_days_ago)
-                else:
-                    last_purchase_date = None
-                
-                # Customer preferences
-                preferred_categories = np.random.choice(['Electronics', 'Clothing', 'Home & Kitchen', 'Books', 'Toys'], 
-                                                       size=np.random.randint(1, 4), 
-                                                       replace=False)
-                preferred_payment = np.random.choice(['Credit Card', 'PayPal', 'Bank Transfer', 'Cash on Delivery'])
-                
-                # Add to customers list
-                customers.append({
-                    'customer_id': customer_id,
-                    'name': name,
-                    'email': email,
-                    'phone': phone,
-                    'registration_date': registration_date,
-                    'last_purchase_date': last_purchase_date,
-                    'segment': segment,
-                    'country': country,
-                    'state': state,
-                    'zip_code': zip_code,
-                    'total_orders': total_orders,
-                    'total_spent': total_spent,
-                    'avg_order_value': round(aov, 2),
-                    'preferred_categories': ', '.join(preferred_categories),
-                    'preferred_payment': preferred_payment,
-                    'is_subscribed': np.random.choice([True, False], p=[0.7, 0.3]),
-                    'has_returned_items': np.random.choice([True, False], p=[0.1, 0.9]),
-                })
+            first_names = ['John', 'Jane', 'Michael', 'Emily', 'David', 'Sarah', 'James', 'Jennifer', 'Robert', 'Lisa']
+            last_names = ['Smith', 'Johnson', 'Williams', 'Jones', 'Brown', 'Davis', 'Miller', 'Wilson', 'Moore', 'Taylor']
+            states = ['CA', 'NY', 'TX', 'FL', 'IL', 'PA', 'OH', 'GA', 'NC', 'MI']
+            categories = ['Electronics', 'Clothing', 'Home & Kitchen', 'Books', 'Toys']
+            
+            # Generate customer data, drawing each column for all customers at once
+            rng = np.random.default_rng()
+            n_customers = len(registration_dates)
+            customer_numbers = (1000 + np.arange(n_customers)).astype(str)
+            
+            def digits(low, high):
+                return rng.integers(low, high, size=n_customers).astype(str)
+            
+            # Random names and realistic phone number format
+            name = np.char.add(np.char.add(rng.choice(first_names, size=n_customers), ' '), rng.choice(last_names, size=n_customers))
+            phone = np.char.add(np.char.add(np.char.add(np.char.add(np.char.add('(', digits(100, 999)), ') '), digits(100, 999)), '-'), digits(1000, 9999))
+            
+            # Demographics and address information
+            segment = rng.choice(segments, p=segment_probs, size=n_customers)
+            country = rng.choice(countries, p=country_probs, size=n_customers)
+            state = np.where(country == 'USA', rng.choice(states, size=n_customers), '')
+            zip_code = np.where(
+                np.isin(country, ['USA', 'Canada']),
+                digits(10000, 99999),
+                np.char.add(np.char.add(digits(10, 999), '-'), digits(100, 9999))
+            )
+            
+            # Purchase history and average order value depend on the segment
+            is_segment = [segment == label for label in ('VIP', 'Regular', 'Inactive', 'Wholesale')]
+            total_orders = np.select(is_segment, [
+                rng.integers(20, 100, size=n_customers),
+                rng.integers(5, 30, size=n_customers),
+                rng.integers(1, 5, size=n_customers),
+                rng.integers(10, 50, size=n_customers)
+            ], 0)  # New
+            aov = np.select(is_segment, [
+                rng.uniform(100, 500, size=n_customers),
+                rng.uniform(50, 150, size=n_customers),
+                rng.uniform(20, 80, size=n_customers),
+                rng.uniform(300, 1000, size=n_customers)
+            ], 0.0)  # New
+            total_spent = np.where(total_orders > 0, np.round(total_orders * aov, 2), 0)
+            
+            # Last purchase date, capped at 1 year or the registration period;
+            # inactive customers haven't purchased recently, active ones have
+            max_days = np.minimum((end_date - registration_dates).days.to_numpy(), 365)
+            last_purchase_days_ago = np.where(
+                segment == 'Inactive',
+                rng.integers(180, np.maximum(max_days, 181)),
+                rng.integers(1, np.maximum(np.minimum(90, max_days), 2))
+            )
+            last_purchase_date = pd.Series(end_date - pd.to_timedelta(last_purchase_days_ago, unit='D')).where(total_orders > 0)
+            
+            # Customer preferences: 1-3 distinct categories per customer
+            category_order = np.array(categories)[np.argsort(rng.random((n_customers, len(categories))), axis=1)]
+            num_categories = rng.integers(1, 4, size=n_customers)
+            two_categories = np.char.add(np.char.add(category_order[:, 0], ', '), category_order[:, 1])
+            preferred_categories = np.select(
+                [num_categories == 1, num_categories == 2],
+                [category_order[:, 0], two_categories],
+                np.char.add(np.char.add(two_categories, ', '), category_order[:, 2])
+            )
             
             # Create a DataFrame
-            df_customers = pd.DataFrame(customers)
+            df_customers = pd.DataFrame({
+                'customer_id': np.char.add('CUST-', customer_numbers),
+                'name': name,
+                'email': np.char.add(np.char.add('customer_', customer_numbers), '@example.com'),
+                'phone': phone,
+                'registration_date': registration_dates,
+                'last_purchase_date': last_purchase_date,
+                'segment': segment,
+                'country': country,
+                'state': state,
+                'zip_code': zip_code,
+                'total_orders': total_orders,
+                'total_spent': total_spent,
+                'avg_order_value': np.round(aov, 2),
+                'preferred_categories': preferred_categories,
+                'preferred_payment': rng.choice(['Credit Card', 'PayPal', 'Bank Transfer', 'Cash on Delivery'], size=n_customers),
+                'is_subscribed': rng.random(n_customers) < 0.7,
+                'has_returned_items': rng.random(n_customers) < 0.1,
+            })
             
-            # Create a second sheet with customer feedback
-            feedback = []
+            # Create a second sheet with customer feedback from a random subset
+            # of customers, skipping customers with no purchases
+            customer_idx = rng.integers(0, n_customers, size=150)
+            customer_idx = customer_idx[total_orders[customer_idx] > 0]
+            n_feedback = len(customer_idx)
             
-            # Generate feedback for a subset of customers
-            for i in range(150):
-                customer_idx = np.random.randint(0, len(customers))
-                customer = customers[customer_idx]
-                
-                # Feedback data
-                feedback_date = customer['last_purchase_date']
-                if feedback_date is not None:
-                    feedback_date += pd.Timedelta(days=np.random.randint(1, 14))
-                else:
-                    continue  # Skip customers with no purchases
-                
-                # Rating on 1-5 scale
-                if customer['segment'] in ['VIP', 'Regular']:
-                    # Satisfied customers are more likely to be VIPs or Regulars
-                    rating = np.random.choice([3, 4, 5], p=[0.1, 0.3, 0.6])
-                else:
-                    # More variation in other segments
-                    rating = np.random.choice([1, 2, 3, 4, 5], p=[0.05, 0.1, 0.2, 0.35, 0.3])
-                
-                # Feedback text based on rating
-                if rating >= 4:
-                    comments = np.random.choice([
-                        "Great experience shopping on your site!",
-                        "Products arrived quickly and in perfect condition.",
-                        "Excellent customer service and product quality.",
-                        "Very satisfied with my purchase.",
-                        "Will definitely buy from you again."
-                    ])
-                elif rating == 3:
-                    comments = np.random.choice([
-                        "Decent experience but room for improvement.",
-                        "Product was okay but shipping was slow.",
-                        "Satisfactory overall but nothing exceptional.",
-                        "Product met expectations but pricing was high.",
-                        "Average service, may or may not return."
-                    ])
-                else:
-                    comments = np.random.choice([
-                        "Disappointed with product quality.",
-                        "Shipping took too long.",
-                        "Customer service was unhelpful.",
-                        "Product did not match description.",
-                        "Had issues with my order."
-                    ])
-                
-                # Add to feedback list
-                feedback.append({
-                    'customer_id': customer['customer_id'],
-                    'feedback_date': feedback_date,
-                    'rating': rating,
-                    'comments': comments,
-                    'product_category': np.random.choice(customer['preferred_categories'].split(', ')),
-                    'would_recommend': rating >= 4,
-                    'feedback_source': np.random.choice(['Email', 'Website', 'App', 'Phone']),
-                })
+            feedback_date = last_purchase_date.to_numpy()[customer_idx] + pd.to_timedelta(rng.integers(1, 14, size=n_feedback), unit='D')
+            
+            # Rating on 1-5 scale; satisfied customers are more likely to be
+            # VIPs or Regulars, with more variation in other segments
+            rating = np.where(
+                np.isin(segment[customer_idx], ['VIP', 'Regular']),
+                rng.choice([3, 4, 5], p=[0.1, 0.3, 0.6], size=n_feedback),
+                rng.choice([1, 2, 3, 4, 5], p=[0.05, 0.1, 0.2, 0.35, 0.3], size=n_feedback)
+            )
+            
+            # Feedback text based on rating
+            positive_comments = np.array([
+                "Great experience shopping on your site!",
+                "Products arrived quickly and in perfect condition.",
+                "Excellent customer service and product quality.",
+                "Very satisfied with my purchase.",
+                "Will definitely buy from you again."
+            ])
+            neutral_comments = np.array([
+                "Decent experience but room for improvement.",
+                "Product was okay but shipping was slow.",
+                "Satisfactory overall but nothing exceptional.",
+                "Product met expectations but pricing was high.",
+                "Average service, may or may not return."
+            ])
+            negative_comments = np.array([
+                "Disappointed with product quality.",
+                "Shipping took too long.",
+                "Customer service was unhelpful.",
+                "Product did not match description.",
+                "Had issues with my order."
+            ])
+            comment_idx = rng.integers(0, 5, size=n_feedback)
+            comments = np.select(
+                [rating >= 4, rating == 3],
+                [positive_comments[comment_idx], neutral_comments[comment_idx]],
+                negative_comments[comment_idx]
+            )
+            
+            # Feedback is about one of the customer's preferred categories
+            category_pick = (rng.random(n_feedback) * num_categories[customer_idx]).astype(int)
             
             # Create a DataFrame for feedback
-            df_feedback = pd.DataFrame(feedback)
-            
-            # Create a third sheet with customer segments analysis
-            segment_analysis = []
-            for segment in segments:
-                segment_customers = [c for c in customers if c['segment'] == segment]
-                if not segment_customers:
-                    continue
-                    
-                avg_orders = np.mean([c['total_orders'] for c in segment_customers])
-                avg_spent = np.mean([c['total_spent'] for c in segment_customers])
-                count = len(segment_customers)
-                
-                # Count customers by country
-                countries_count = {}
-                for c in segment_customers:
-                    country = c['country']
-                    countries_count[country] = countries_count.get(country, 0) + 1
-                
-                # Find most common country
-                most_common_country = max(countries_count.items(), key=lambda x: x[1])[0] if countries_count else 'N/A'
-                
-                # Calculate retention rate (customers with more than 1 order)
-                retention_rate = len([c for c in segment_customers if c['total_orders'] > 1]) / count if count > 0 else 0
-                
-                segment_analysis.append({
-                    'segment': segment,
-                    'customer_count': count,
-                    'avg_orders_per_customer': round(avg_orders, 2),
-                    'avg_lifetime_value': round(avg_spent, 2),
-                    'most_common_country': most_common_country,
-                    'retention_rate': round(retention_rate, 2),
-                    'analysis_date': datetime.now().strftime('%Y-%m-%d'),
-                    'growth_opportunity': np.random.choice(['High', 'Medium', 'Low']),
-                    'recommended_actions': np.random.choice([
-                        "Targeted email campaign",
-                        "Loyalty program enhancements",
-                        "Re-engagement offers",
-                        "Premium support services",
-                        "Bulk order discounts"
-                    ])
-                })
+            df_feedback = pd.DataFrame({
+                'customer_id': df_customers['customer_id'].to_numpy()[customer_idx],
+                'feedback_date': feedback_date,
+                'rating': rating,
+                'comments': comments,
+                'product_category': category_order[customer_idx, category_pick],
+                'would_recommend': rating >= 4,
+                'feedback_source': rng.choice(['Email', 'Website', 'App', 'Phone'], size=n_feedback),
+            })
+            
+            # Create a third sheet with customer segments analysis, aggregating
+            # every segment in one groupby pass
+            segment_stats = df_customers.assign(
+                retained=df_customers['total_orders'] > 1  # Customers with more than 1 order
+            ).groupby('segment').agg(
+                customer_count=('customer_id', 'size'),
+                avg_orders_per_customer=('total_orders', 'mean'),
+                avg_lifetime_value=('total_spent', 'mean'),
+                most_common_country=('country', lambda country: country.mode().iat[0]),
+                retention_rate=('retained', 'mean')
+            ).round(2)
+            
+            # Keep the segments in their defined order
+            segment_stats = segment_stats.reindex([segment for segment in segments if segment in segment_stats.index])
+            n_segments = len(segment_stats)
             
             # Create a DataFrame for segment analysis
-            df_segment_analysis = pd.DataFrame(segment_analysis)
+            df_segment_analysis = segment_stats.reset_index().assign(
+                analysis_date=datetime.now().strftime('%Y-%m-%d'),
+                growth_opportunity=rng.choice(['High', 'Medium', 'Low'], size=n_segments),
+                recommended_actions=rng.choice([
+                    "Targeted email campaign",
+                    "Loyalty program enhancements",
+                    "Re-engagement offers",
+                    "Premium support services",
+                    "Bulk order discounts"
+                ], size=n_segments)
+            )
             
-            # Create Excel writer with multiple sheets
-            with pd.ExcelWriter(self.source_file, engine='openpyxl') as writer:
-                df_customers.to_excel(writer, sheet_name='Customers', index=False)
-                df_feedback.to_excel(writer, sheet_name='Customer Feedback', index=False)
-                df_segment_analysis.to_excel(writer, sheet_name='Segment Analysis', index=False)
+            # Stream each sheet to disk with a write-only workbook
+            workbook = openpyxl.Workbook(write_only=True)
+            for title, df in (
+                ('Customers', df_customers),
+                ('Customer Feedback', df_feedback),
+                ('Segment Analysis', df_segment_analysis)
+            ):
+                sheet = workbook.create_sheet(title)
+                sheet.append(list(df.columns))
+                for row in df.itertuples(index=False, name=None):
+                    sheet.append(row)
+            workbook.save(self.source_file)
             
             logger.info(f"Created sample Excel file with customer data: {self.source_file}")
             
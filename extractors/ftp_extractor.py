@@ -7,14 +7,23 @@ FTP Extractor module for extracting e-commerce data from FTP servers.
 
 import logging
 import pandas as pd
-import os
-import tempfile
+import io
 from datetime import datetime
 import ftplib
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+# Date formats seen in FTP directory listings
+_FMTS = (
+    '%b %d %Y',  # Jan 01 2022
+    '%b %d %H:%M',  # Jan 01 12:34
+    '%Y-%m-%d %H:%M',  # 2022-01-01 12:34
+    '%d %b %Y',  # 01 Jan 2022
+    '%d %b %Y %H:%M',  # 01 Jan 2022 12:34
+)
+
 class FTPExtractor:
     """Extracts e-commerce data from FTP servers."""
     
@@ -31,7 +40,7 @@ class FTPExtractor:
         self.ftp_password = config.ftp_password
         self.ftp_port = config.ftp_port
         self.ftp_path = config.ftp_path
-        self.output_dir = os.path.join(config.data_dir, 'ftp')
+        self.max_workers = max(1, config.ftp_max_workers)
     
     def extract(self, start_date=None, end_date=None, file_pattern=None):
         """
@@ -50,9 +59,6 @@ class FTPExtractor:
         """
         logger.info(f"Extracting data from FTP server: {self.ftp_host}")
         
-        # Create output directory if it doesn't exist
-        os.makedirs(self.output_dir, exist_ok=True)
-        
         try:
             # Connect to FTP server
             logger.info(f"Connecting to FTP server: {self.ftp_host}:{self.ftp_port}")
@@ -63,17 +69,20 @@ class FTPExtractor:
                 return self._mock_ftp_extraction(start_date, end_date, file_pattern)
             
             # Real FTP connection
-            ftp = ftplib.FTP()
-            ftp.connect(self.ftp_host, self.ftp_port)
-            ftp.login(self.ftp_user, self.ftp_password)
-            
-            # Change to the specified directory
-            if self.ftp_path:
-                ftp.cwd(self.ftp_path)
+            ftp = self._connect()
             
             # List files in the directory
             files = []
             ftp.retrlines('LIST', lambda x: files.append(x))
+            ftp.quit()
+            
+            # Compile the file pattern once for all listed files
+            file_re = re.compile(file_pattern) if file_pattern else None
+            
+            # Parse the filter bounds and the current year once for all listings
+            start_dt = datetime.strptime(start_date, '%Y-%m-%d') if start_date else None
+            end_dt = datetime.strptime(end_date, '%Y-%m-%d') if end_date else None
+            current_year = datetime.now().year
             
             # Parse file listings to get names and dates
             file_infos = []
@@ -88,16 +97,21 @@ class FTPExtractor:
                     
                     try:
                         # Parse date from FTP listing
-                        file_date = self._parse_ftp_date(date_str)
+                        file_date = self._parse_ftp_date(date_str, current_year)
                         
                         # Apply date filtering
-                        if start_date and file_date < datetime.strptime(start_date, '%Y-%m-%d'):
+                        if start_dt and file_date < start_dt:
                             continue
-                        if end_date and file_date > datetime.strptime(end_date, '%Y-%m-%d'):
+                        if end_dt and file_date > end_dt:
                             continue
                         
                         # Apply file pattern filtering
-                        if file_pattern and not re.match(file_pattern, filename):
+                        if file_re and not file_re.match(filename):
+                            continue
+                        
+                        # Skip formats we cannot parse before downloading them
+                        if not filename.endswith(('.csv', '.xlsx', '.xls', '.json')):
+                            logger.warning(f"Unsupported file format: {filename}")
                             continue
                         
                         file_infos.append({'filename': filename, 'date': file_date})
@@ -107,37 +121,18 @@ class FTPExtractor:
             # Sort files by date (most recent first)
             file_infos.sort(key=lambda x: x['date'], reverse=True)
             
-            # Download files
-            all_data = []
-            for file_info in file_infos:
-                filename = file_info['filename']
-                local_path = os.path.join(self.output_dir, filename)
-                
-                logger.info(f"Downloading file: {filename}")
-                
-                # Download file
-                with open(local_path, 'wb') as f:
-                    ftp.retrbinary(f'RETR {filename}', f.write)
-                
-                # Read file based on extension
-                if filename.endswith('.csv'):
-                    df = pd.read_csv(local_path)
-                elif filename.endswith('.xlsx') or filename.endswith('.xls'):
-                    df = pd.read_excel(local_path)
-                elif filename.endswith('.json'):
-                    df = pd.read_json(local_path)
-                else:
-                    logger.warning(f"Unsupported file format: {filename}")
-                    continue
-                
-                # Add filename as a column
-                df['source_file'] = filename
-                
-                # Add to combined data
-                all_data.append(df)
+            # Download files concurrently, each worker on its own FTP session
+            filenames = [file_info['filename'] for file_info in file_infos]
+            num_workers = min(self.max_workers, len(filenames))
+            frames = {}
+            if num_workers:
+                batches = [filenames[i::num_workers] for i in range(num_workers)]
+                with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                    for batch_frames in executor.map(self._download_files, batches):
+                        frames.update(batch_frames)
             
-            # Close FTP connection
-            ftp.quit()
+            # Keep the most-recent-first order of the listing
+            all_data = [frames[filename] for filename in filenames]
             
             # Combine all data
             if all_data:
@@ -153,12 +148,66 @@ class FTPExtractor:
             logger.info("Falling back to mock data...")
             return self._mock_ftp_extraction(start_date, end_date, file_pattern)
     
-    def _parse_ftp_date(self, date_str):
+    def _connect(self):
+        """
+        Open an FTP session logged in and positioned at the configured path.
+        
+        Returns:
+            ftplib.FTP: Connected FTP session
+        """
+        ftp = ftplib.FTP()
+        ftp.connect(self.ftp_host, self.ftp_port)
+        ftp.login(self.ftp_user, self.ftp_password)
+        
+        # Change to the specified directory
+        if self.ftp_path:
+            ftp.cwd(self.ftp_path)
+        
+        return ftp
+    
+    def _download_files(self, filenames):
+        """
+        Download and parse a batch of files over a dedicated FTP session.
+        
+        Args:
+            filenames (list): Names of the files to download
+        
+        Returns:
+            dict: DataFrames keyed by filename
+        """
+        frames = {}
+        ftp = self._connect()
+        try:
+            for filename in filenames:
+                logger.info(f"Downloading file: {filename}")
+                
+                # Download file into memory and parse it from there
+                buf = io.BytesIO()
+                ftp.retrbinary(f'RETR {filename}', buf.write)
+                buf.seek(0)
+                
+                # Read file based on extension
+                if filename.endswith('.csv'):
+                    df = pd.read_csv(buf)
+                elif filename.endswith('.json'):
+                    df = pd.read_json(buf)
+                else:
+                    df = pd.read_excel(buf)
+                
+                # Add filename as a column
+                frames[filename] = df.assign(source_file=filename)
+        finally:
+            ftp.quit()
+        
+        return frames
+    
+    def _parse_ftp_date(self, date_str, current_year=None):
         """
         Parse date from FTP listing.
         
         Args:
             date_str (str): Date string from FTP listing
+            current_year (int, optional): Year to assume when the listing omits it
         
         Returns:
             datetime: Parsed date
@@ -166,26 +215,30 @@ class FTPExtractor:
         Raises:
             ValueError: If date cannot be parsed
         """
-        # Try various date formats
-        formats = [
-            '%b %d %Y',  # Jan 01 2022
-            '%b %d %H:%M',  # Jan 01 12:34
-            '%Y-%m-%d %H:%M',  # 2022-01-01 12:34
-            '%d %b %Y',  # 01 Jan 2022
-            '%d %b %Y %H:%M',  # 01 Jan 2022 12:34
-        ]
-        
         # If year is missing, assume current year
-        if ':' in date_str:
-            parts = date_str.split()
-            if len(parts) == 3:
-                current_year = datetime.now().year
-                date_str = f"{parts[0]} {parts[1]} {current_year}"
-        
-        # Try each format
-        for fmt in formats:
+        parts = date_str.split()
+        if ':' in date_str and len(parts) == 3:
+            date_str = f"{parts[0]} {parts[1]} {current_year or datetime.now().year}"
+        
+        # Pick the format from the shape of the string
+        if '-' in date_str:
+            fmt = '%Y-%m-%d %H:%M'
+        elif date_str[:1].isdigit():
+            fmt = '%d %b %Y %H:%M' if ':' in date_str else '%d %b %Y'
+        else:
+            fmt = '%b %d %Y'
+        
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            pass
+        
+        # Fall back to trying the remaining formats
+        for other in _FMTS:
+            if other == fmt:
+                continue
             try:
-                return datetime.strptime(date_str, fmt)
+                return datetime.strptime(date_str, other)
             except ValueError:
                 continue
         
@@ -219,50 +272,55 @@ class FTPExtractor:
         # Generate dates within the range
         dates = pd.date_range(start=start_date_dt, end=end_date_dt, freq='D')
         
-        # Create empty list to store data
-        data = []
-        
         # Partner IDs
         partner_ids = ['PARTNER-A', 'PARTNER-B', 'PARTNER-C']
         
-        # Product categories
+        # Product categories and order statuses
         categories = ['Electronics', 'Clothing', 'Home & Kitchen', 'Books', 'Toys']
+        statuses = ['Processed', 'Shipped', 'Delivered']
         
-        # Generate random order data from partners
-        for date in dates:
-            # Each partner might not send data every day
-            for partner in partner_ids:
-                if np.random.random() < 0.7:  # 70% chance of sending data on a given day
-                    # Number of orders for this partner on this day
-                    num_orders = np.random.randint(5, 20)
-                    
-                    for _ in range(num_orders):
-                        # Generate order data
-                        order_id = f"{partner}-{np.random.randint(10000, 99999)}"
-                        category = np.random.choice(categories)
-                        quantity = np.random.randint(1, 5)
-                        unit_price = round(np.random.uniform(10, 200), 2)
-                        total_price = round(quantity * unit_price, 2)
-                        
-                        # Add to data list
-                        data.append({
-                            'order_id': order_id,
-                            'order_date': pd.Timestamp(date).to_pydatetime().strftime('%Y-%m-%d'),
-                            'partner_id': partner,
-                            'product_category': category,
-                            'quantity': quantity,
-                            'unit_price': unit_price,
-                            'total_price': total_price,
-                            'status': np.random.choice(['Processed', 'Shipped', 'Delivered'], p=[0.2, 0.3, 0.5]),
-                            'source_file': f"{partner}_orders_{date.strftime('%Y%m%d')}.csv"
-                        })
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
+        # Each partner might not send data every day: 70% chance of a file
+        # per (date, partner), each holding 5-19 orders
+        rng = np.random.default_rng()
+        n_partners = len(partner_ids)
+        sends = rng.random((len(dates), n_partners)) < 0.7
+        orders_per_file = np.where(sends, rng.integers(5, 20, size=sends.shape), 0).ravel()
+        
+        # Expand the per-file counts into one file index per order
+        file_idx = np.repeat(np.arange(orders_per_file.size), orders_per_file)
+        date_idx = file_idx // n_partners
+        partner_idx = file_idx % n_partners
+        n_orders = len(file_idx)
+        
+        # Generate order data for all orders at once
+        partner_arr = np.array(partner_ids)[partner_idx]
+        order_id = np.char.add(np.char.add(partner_arr, '-'), rng.integers(10000, 99999, size=n_orders).astype(str))
+        quantity = rng.integers(1, 5, size=n_orders)
+        unit_price = np.round(rng.uniform(10, 200, size=n_orders), 2)
+        total_price = np.round(quantity * unit_price, 2)
+        
+        # One source file name per (date, partner), in file index order
+        file_names = [
+            f"{partner}_orders_{day}.csv"
+            for day in dates.strftime('%Y%m%d')
+            for partner in partner_ids
+        ]
+        
+        df = pd.DataFrame({
+            'order_id': order_id,
+            'order_date': dates.strftime('%Y-%m-%d').to_numpy()[date_idx],
+            'partner_id': pd.Categorical.from_codes(partner_idx, partner_ids),
+            'product_category': pd.Categorical.from_codes(rng.integers(0, len(categories), size=n_orders), categories),
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'total_price': total_price,
+            'status': pd.Categorical.from_codes(rng.choice(len(statuses), p=[0.2, 0.3, 0.5], size=n_orders), statuses),
+            'source_file': pd.Categorical.from_codes(file_idx, file_names).remove_unused_categories()
+        })
         
         # Apply file pattern filtering if provided
         if file_pattern:
-            df = df[df['source_file'].str.match(file_pattern)]
+            df = df[df['source_file'].str.match(re.compile(file_pattern))]
         
         logger.info(f"Generated {len(df)} rows of mock FTP data")
         return df
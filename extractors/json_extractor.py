@@ -9,10 +9,48 @@ import logging
 import pandas as pd
 import os
 import json
-from datetime import datetime
+import mmap
+from datetime import datetime, timedelta
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _HAS_ORJSON = True
+except ImportError:
+    _json_loads = json.loads
+    _HAS_ORJSON = False
+
+try:
+    import pyarrow
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
+try:
+    import ijson
+    _HAS_IJSON = True
+except ImportError:
+    _HAS_IJSON = False
 
 logger = logging.getLogger(__name__)
 
+# Files at least this large are streamed with ijson when it is installed
+STREAM_THRESHOLD_BYTES = 100 * 1024 * 1024
+
+def _is_json_array(path):
+    """Check whether a JSON file holds a top-level array."""
+    with open(path, 'rb') as f:
+        return f.read(64).lstrip()[:1] == b'['
+
+def _load_json(path):
+    """Parse a JSON file, handing orjson a memory-mapped view instead of a copy."""
+    with open(path, 'rb') as f:
+        if not _HAS_ORJSON or os.fstat(f.fileno()).st_size == 0:
+            return _json_loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
 class JSONExtractor:
     """Extracts e-commerce product data from JSON files."""
     
@@ -25,6 +63,9 @@ class JSONExtractor:
         """
         self.config = config
         self.source_file = config.products_json
+        
+        # Normalized Parquet copy reused until the JSON file changes
+        self.parquet_file = os.path.splitext(self.source_file)[0] + '.parquet'
     
     def extract(self, start_date=None, end_date=None, product_category=None):
         """
@@ -50,28 +91,41 @@ class JSONExtractor:
             self._create_sample_data()
         
         try:
-            # Read JSON file
-            with open(self.source_file, 'r') as f:
-                data = json.load(f)
-            
-            # Convert to DataFrame
-            df = pd.json_normalize(data)
-            
-            # Handle dates if they exist in the data
-            date_columns = [col for col in df.columns if 'date' in col.lower()]
-            for col in date_columns:
-                df[col] = pd.to_datetime(df[col])
-            
-            # Apply date filtering if provided and date columns exist
-            if start_date and date_columns:
-                start_date = pd.to_datetime(start_date)
+            if self._parquet_is_current():
+                # Read the normalized Parquet copy instead of re-parsing the JSON
+                df = pd.read_parquet(self.parquet_file)
+                date_columns = [col for col in df.columns if 'date' in col.lower()]
+            else:
+                # Read JSON file, streaming large arrays so the category filter
+                # is applied while parsing
+                streamed = _HAS_IJSON and os.path.getsize(self.source_file) >= STREAM_THRESHOLD_BYTES and _is_json_array(self.source_file)
+                if streamed:
+                    logger.info("Streaming large JSON file with ijson")
+                    data = self._stream_records(product_category)
+                else:
+                    data = _load_json(self.source_file)
+                
+                # Convert to DataFrame
+                df = self._to_frame(data)
+                
+                # Handle dates if they exist in the data
+                date_columns = [col for col in df.columns if 'date' in col.lower()]
                 for col in date_columns:
-                    df = df[df[col] >= start_date]
+                    df[col] = pd.to_datetime(df[col])
+                
+                # Keep a Parquet copy of the full catalog for later extracts
+                if _HAS_PYARROW and not (streamed and product_category):
+                    self._write_parquet(df)
             
-            if end_date and date_columns:
-                end_date = pd.to_datetime(end_date)
+            # Apply date filtering if provided and date columns exist, combining
+            # every column and bound into one mask so the frame is sliced once
+            if date_columns and (start_date or end_date):
+                start = pd.to_datetime(start_date) if start_date else pd.Timestamp.min
+                end = pd.to_datetime(end_date) if end_date else pd.Timestamp.max
+                mask = pd.Series(True, index=df.index)
                 for col in date_columns:
-                    df = df[df[col] <= end_date]
+                    mask &= df[col].between(start, end)
+                df = df.loc[mask]
             
             # Apply product category filtering if provided
             if product_category and 'category' in df.columns:
@@ -88,10 +142,126 @@ class JSONExtractor:
             logger.error(f"Error extracting data from JSON file: {str(e)}")
             raise
     
+    def _parquet_is_current(self):
+        """
+        Check whether the Parquet copy of the source JSON can be read instead.
+        
+        Returns:
+            bool: True if the Parquet file exists and is not older than the JSON
+        """
+        if not _HAS_PYARROW or not os.path.exists(self.parquet_file):
+            return False
+        return os.path.getmtime(self.parquet_file) >= os.path.getmtime(self.source_file)
+    
+    def _write_parquet(self, df):
+        """
+        Write the normalized products to the Parquet copy.
+        
+        Catalogs whose columns mix value types cannot be stored as Parquet;
+        those are logged and simply re-parsed on the next extract.
+        
+        Args:
+            df (pandas.DataFrame): Normalized product data
+        """
+        try:
+            df.to_parquet(self.parquet_file, index=False, compression='zstd')
+        except (ValueError, TypeError, OSError) as e:
+            logger.warning(f"Could not write Parquet copy of JSON data: {str(e)}")
+            if os.path.exists(self.parquet_file):
+                os.remove(self.parquet_file)
+    
+    def _stream_records(self, product_category=None):
+        """
+        Stream the records of a top-level JSON array with ijson.
+        
+        Records of other categories are dropped as they are parsed, so only
+        matching products are held in memory. As with the DataFrame filter,
+        records without a category are only kept if no record has one.
+        Attribute columns that only occur in dropped records are not created.
+        
+        Args:
+            product_category (str, optional): Category to keep
+        
+        Returns:
+            list: Parsed records
+        """
+        records = []
+        uncategorized = []
+        has_category = False
+        with open(self.source_file, 'rb') as f:
+            for record in ijson.items(f, 'item', use_float=True):
+                if not product_category or not isinstance(record, dict):
+                    records.append(record)
+                elif 'category' in record:
+                    if not has_category:
+                        has_category = True
+                        uncategorized = []
+                    if record['category'] == product_category:
+                        records.append(record)
+                elif not has_category:
+                    uncategorized.append(record)
+        
+        return records if has_category or not product_category else uncategorized
+    
+    def _to_frame(self, data):
+        """
+        Convert loaded JSON records to a flat DataFrame.
+        
+        Records that only nest plain one-level dicts (such as the product
+        attributes) are built with pd.DataFrame directly, and each nested
+        column is expanded into prefixed columns in one go. Anything deeper,
+        or with lists, goes through pd.json_normalize.
+        
+        Args:
+            data (list): Records loaded from the JSON file
+        
+        Returns:
+            pandas.DataFrame: Flattened data, with the same columns pd.json_normalize gives
+        """
+        if not isinstance(data, list):
+            return pd.json_normalize(data)
+        
+        # Find the keys holding flat dicts; fall back on anything else nested.
+        # Column order follows pd.json_normalize: each record's scalar keys
+        # in place, followed by its flattened nested keys
+        nested_keys = set()
+        scalar_keys = set()
+        columns = {}
+        for record in data:
+            if not isinstance(record, dict):
+                return pd.json_normalize(data)
+            flattened = []
+            for key, value in record.items():
+                if isinstance(value, dict):
+                    if any(isinstance(v, (dict, list)) for v in value.values()):
+                        return pd.json_normalize(data)
+                    nested_keys.add(key)
+                    flattened.extend(f'{key}.{sub_key}' for sub_key in value)
+                elif isinstance(value, list):
+                    return pd.json_normalize(data)
+                else:
+                    scalar_keys.add(key)
+                    columns.setdefault(key)
+            for column in flattened:
+                columns.setdefault(column)
+        
+        if nested_keys & scalar_keys:
+            return pd.json_normalize(data)
+        
+        df = pd.DataFrame(data)
+        if not nested_keys:
+            return df
+        
+        # Expand each nested column in one go
+        frames = [df.drop(columns=list(nested_keys))]
+        for key in nested_keys:
+            values = [value if isinstance(value, dict) else {} for value in df[key]]
+            frames.append(pd.DataFrame(values, index=df.index).add_prefix(f'{key}.'))
+        
+        return pd.concat(frames, axis=1)[list(columns)]
+    
     def _create_sample_data(self):
         """Create sample e-commerce product data for demonstration purposes."""
-        import numpy as np
-        
         # Sample product categories
         categories = ['Electronics', 'Clothing', 'Home & Kitchen', 'Books', 'Toys']
         
@@ -108,50 +278,54 @@ class JSONExtractor:
         # Ensure directory exists
         os.makedirs(os.path.dirname(self.source_file), exist_ok=True)
         
-        # Create a list to store products
-        products = []
+        # Creation dates cycle through the last 30 days; format each one once
+        now = datetime.now()
+        created_dates = [(now - timedelta(days=days)).strftime("%Y-%m-%d") for days in range(30)]
         
-        # Generate 100 simple product records
-        for i in range(100, 200):
-            product_id = i
-            category = categories[i % len(categories)]
-            brand = brands[category][i % len(brands[category])]
-            
-            # Create a simple product dictionary with standard Python types
-            product = {
-                "id": str(product_id),
-                "name": f"{brand} Product {i}",
-                "category": category,
-                "brand": brand,
-                "price": float(50 + (i % 10) * 10),
-                "stock": int(10 + (i % 5) * 5),
-                "created_date": (datetime.now() - timedelta(days=i % 30)).strftime("%Y-%m-%d"),
-                "description": f"This is a sample {category} product from {brand}."
-            }
-            
-            # Add some category-specific attributes as simple strings and numbers
+        def attributes(i, category):
+            """Category-specific attributes as simple strings."""
             if category == "Electronics":
-                product["attributes"] = {
+                return {
                     "type": "Smartphone" if i % 3 == 0 else "Laptop",
                     "color": "Black" if i % 2 == 0 else "Silver",
                     "memory": "8 GB" if i % 2 == 0 else "16 GB"
                 }
-            elif category == "Clothing":
-                product["attributes"] = {
+            if category == "Clothing":
+                return {
                     "size": "M" if i % 3 == 0 else "L",
                     "color": "Blue" if i % 2 == 0 else "Black",
                 }
-            else:
-                product["attributes"] = {
-                    "feature": f"Feature {i % 5 + 1}"
-                }
-                
-            products.append(product)
+            return {
+                "feature": f"Feature {i % 5 + 1}"
+            }
+        
+        # Generate 100 simple product records as dict literals with standard Python types
+        product_ids = range(100, 200)
+        product_categories = [categories[i % len(categories)] for i in product_ids]
+        product_brands = [brands[category][i % len(brands[category])] for i, category in zip(product_ids, product_categories)]
+        products = [
+            {
+                "id": str(i),
+                "name": f"{brand} Product {i}",
+                "category": category,
+                "brand": brand,
+                "price": float(50 + (i % 10) * 10),
+                "stock": int(10 + (i % 5) * 5),
+                "created_date": created_dates[i % 30],
+                "description": f"This is a sample {category} product from {brand}.",
+                "attributes": attributes(i, category)
+            }
+            for i, category, brand in zip(product_ids, product_categories, product_brands)
+        ]
         
         # Write JSON to file
         try:
-            with open(self.source_file, 'w') as f:
-                json.dump(products, f, indent=4)
+            if _HAS_ORJSON:
+                with open(self.source_file, 'wb') as f:
+                    f.write(orjson.dumps(products, option=orjson.OPT_INDENT_2))
+            else:
+                with open(self.source_file, 'w') as f:
+                    json.dump(products, f, indent=4)
             logger.info(f"Created sample e-commerce product data: {self.source_file}")
         except Exception as e:
             logger.error(f"Error creating sample JSON file: {str(e)}")
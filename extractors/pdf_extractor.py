@@ -12,8 +12,54 @@ import re
 from datetime import datetime
 import tempfile
 
+try:
+    import pdfplumber
+    _HAS_PDFPLUMBER = True
+except ImportError:
+    _HAS_PDFPLUMBER = False
+
 logger = logging.getLogger(__name__)
 
+# pdfplumber table detection from text alignment, for borderless tables tabula's stream mode reads
+_TEXT_TABLE_SETTINGS = {'vertical_strategy': 'text', 'horizontal_strategy': 'text'}
+
+# Text alignment also matches ordinary prose, so a borderless table only counts
+# when enough of its rows span several cells and hold numeric values
+_NUMERIC_CELL_RE = re.compile(r'[-+]?[$€£]?\s*\d[\d,]*(?:\.\d+)?%?')
+_MIN_TABLE_ROWS = 2
+_MIN_ROW_CELLS = 3
+_MIN_ROW_NUMBERS = 2
+
+# Patterns for pulling invoice details out of PDF text
+_INVOICE_ID_RE = re.compile(r'Invoice\s*#?\s*:?\s*(\w+[-/]?\w+)', re.IGNORECASE)
+_INVOICE_DATE_RE = re.compile(r'Date\s*:?\s*(\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\d{2,4}[-/]\d{1,2}[-/]\d{1,2})', re.IGNORECASE)
+_CUSTOMER_RE = re.compile(r'(?:Customer|Client|Bill To)\s*:?\s*([A-Za-z0-9\s]+)', re.IGNORECASE)
+_PRODUCT_RE = re.compile(r'(\d+)\s+([A-Za-z0-9\s\-]+?)\s+(\d+(?:\.\d+)?)\s+(\d+(?:\.\d+)?)')  # qty name unit total
+
+# Lowercase table column name fragments and the column they map to, checked in order
+_COLUMN_PATTERNS = [
+    (re.compile(r'date|time'), 'invoice_date'),
+    (re.compile(r'id|number|no\.|#'), 'invoice_id'),
+    (re.compile(r'item|product|description'), 'product_description'),
+    (re.compile(r'qty|quantity'), 'quantity'),
+    (re.compile(r'unit|price'), 'unit_price'),
+    (re.compile(r'total|amount'), 'total_price'),
+]
+
+def _is_table_row(row):
+    """Check whether an extracted table row looks like tabular data rather than prose."""
+    cells = [cell.strip() for cell in row if cell and cell.strip()]
+    numbers = sum(1 for cell in cells if _NUMERIC_CELL_RE.fullmatch(cell))
+    return len(cells) >= _MIN_ROW_CELLS and numbers >= _MIN_ROW_NUMBERS
+
+def _map_column(name):
+    """Return the standard column name for a table header, or None if unknown."""
+    name = str(name).lower()
+    for pattern, target in _COLUMN_PATTERNS:
+        if pattern.search(name):
+            return target
+    return None
+
 class PDFExtractor:
     """Extracts e-commerce invoice data from PDF files."""
     
@@ -52,22 +98,23 @@ class PDFExtractor:
         try:
             # Import required packages here to avoid dependencies when not using PDF
             import PyPDF2
-            import tabula
             
-            # Extract tables from PDF
-            logger.info("Extracting tables from PDF")
-            tables = tabula.read_pdf(self.source_file, pages='all', multiple_tables=True)
+            # Extract tables from PDF, only starting tabula's JVM if there are any
+            tables = []
+            if self._has_tables():
+                import tabula
+                
+                logger.info("Extracting tables from PDF")
+                tables = tabula.read_pdf(self.source_file, pages='all', multiple_tables=True)
             
             # If no tables found, try to extract text and parse
             if not tables or all(df.empty for df in tables):
                 logger.info("No tables found in PDF, attempting text extraction")
                 
-                # Extract text from PDF
+                # Extract text from PDF, joining the pages in one go
                 with open(self.source_file, 'rb') as file:
                     pdf_reader = PyPDF2.PdfReader(file)
-                    text = ""
-                    for page_num in range(len(pdf_reader.pages)):
-                        text += pdf_reader.pages[page_num].extract_text()
+                    text = "".join(page.extract_text() or "" for page in pdf_reader.pages)
                 
                 # Parse invoice data from text using regular expressions
                 invoice_data = self._parse_invoice_text(text)
@@ -87,19 +134,9 @@ class PDFExtractor:
                     # Try to identify column types based on content
                     column_mapping = {}
                     for col in df.columns:
-                        col_str = str(col).lower()
-                        if any(term in col_str for term in ['date', 'time']):
-                            column_mapping[col] = 'invoice_date'
-                        elif any(term in col_str for term in ['id', 'number', 'no.', '#']):
-                            column_mapping[col] = 'invoice_id'
-                        elif any(term in col_str for term in ['item', 'product', 'description']):
-                            column_mapping[col] = 'product_description'
-                        elif any(term in col_str for term in ['qty', 'quantity']):
-                            column_mapping[col] = 'quantity'
-                        elif any(term in col_str for term in ['unit', 'price']):
-                            column_mapping[col] = 'unit_price'
-                        elif any(term in col_str for term in ['total', 'amount']):
-                            column_mapping[col] = 'total_price'
+                        target = _map_column(col)
+                        if target:
+                            column_mapping[col] = target
                     
                     # Rename columns if we found mappings
                     if column_mapping:
@@ -135,6 +172,33 @@ class PDFExtractor:
             logger.error(f"Error extracting data from PDF file: {str(e)}")
             raise
     
+    def _has_tables(self):
+        """
+        Check cheaply whether the PDF contains any tables.
+        
+        Uses pdfplumber when it is installed; without it every PDF is assumed
+        to have tables and is handed to tabula. Tables drawn with ruling lines
+        are found directly. Borderless tables are found from text alignment,
+        and only count when several rows have multiple cells holding numbers,
+        so text-only PDFs still skip tabula.
+        
+        Returns:
+            bool: True if the PDF may contain tables
+        """
+        if not _HAS_PDFPLUMBER:
+            return True
+        
+        with pdfplumber.open(self.source_file) as pdf:
+            for page in pdf.pages:
+                if page.find_tables():
+                    return True
+                
+                for table in page.find_tables(table_settings=_TEXT_TABLE_SETTINGS):
+                    if sum(_is_table_row(row) for row in table.extract()) >= _MIN_TABLE_ROWS:
+                        return True
+        
+        return False
+    
     def _parse_invoice_text(self, text):
         """
         Parse invoice data from extracted text.
@@ -149,11 +213,11 @@ class PDFExtractor:
         invoice_items = []
         
         # Try to extract invoice number
-        invoice_match = re.search(r'Invoice\s*#?\s*:?\s*(\w+[-/]?\w+)', text, re.IGNORECASE)
+        invoice_match = _INVOICE_ID_RE.search(text)
         invoice_id = invoice_match.group(1) if invoice_match else None
         
         # Try to extract date
-        date_match = re.search(r'Date\s*:?\s*(\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\d{2,4}[-/]\d{1,2}[-/]\d{1,2})', text, re.IGNORECASE)
+        date_match = _INVOICE_DATE_RE.search(text)
         invoice_date = date_match.group(1) if date_match else None
         
         # Try to convert date to standard format
@@ -164,13 +228,12 @@ class PDFExtractor:
                 pass
         
         # Try to extract customer information
-        customer_match = re.search(r'(?:Customer|Client|Bill To)\s*:?\s*([A-Za-z0-9\s]+)', text, re.IGNORECASE)
+        customer_match = _CUSTOMER_RE.search(text)
         customer = customer_match.group(1).strip() if customer_match else None
         
         # Look for product entries - patterns vary widely between invoice formats
-        # This is a simple pattern that may need to be adjusted based on actual invoice formats
-        product_pattern = r'(\d+)\s+([A-Za-z0-9\s\-]+?)\s+(\d+(?:\.\d+)?)\s+(\d+(?:\.\d+)?)'
-        product_matches = re.finditer(product_pattern, text)
+        # _PRODUCT_RE is a simple pattern that may need to be adjusted based on actual invoice formats
+        product_matches = _PRODUCT_RE.finditer(text)
         
         for match in product_matches:
             try:
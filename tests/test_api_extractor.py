@@ -0,0 +1,156 @@
+"""
+Tests for the Shopify client in APIExtractor, run against a mocked requests.Session.
+"""
+
+import json
+from datetime import datetime
+from unittest import mock
+
+import pytest
+import requests
+
+from extractors.api_extractor import APIExtractor, REQUEST_TIMEOUT, SHOPIFY_API_VERSION
+
+STORE = 'test-store.myshopify.com'
+ORDERS_URL = f"https://{STORE}/admin/api/{SHOPIFY_API_VERSION}/orders.json"
+NEXT_URL = f"{ORDERS_URL}?limit=250&page_info=abc"
+
+class MockConfig:
+    """Minimal configuration with real-looking Shopify credentials."""
+    
+    def __init__(self, data_dir):
+        self.data_dir = str(data_dir)
+        self.shopify_api_key = 'key'
+        self.shopify_api_secret = 'secret'
+        self.shopify_store = STORE
+        self.amazon_access_key = 'demo_key'
+        self.amazon_secret_key = 'demo_secret'
+        self.amazon_seller_id = 'demo_seller'
+        self.amazon_marketplace_id = 'ATVPDKIKX0DER'
+        self.api_response_cache = True
+
+def _order(order_id, quantity=1):
+    return {
+        'id': order_id,
+        'order_number': 1000 + order_id,
+        'customer': {'id': 7},
+        'created_at': '2024-01-02T10:00:00-05:00',
+        'total_price': '19.99',
+        'currency': 'USD',
+        'financial_status': 'paid',
+        'line_items': [{'quantity': quantity}]
+    }
+
+def _response(orders, next_url=None, status=200):
+    response = mock.Mock()
+    response.content = json.dumps({'orders': orders}).encode()
+    response.links = {'next': {'url': next_url}} if next_url else {}
+    if status >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(f"{status} Error")
+    return response
+
+@pytest.fixture
+def extractor(tmp_path):
+    extractor = APIExtractor(MockConfig(tmp_path))
+    extractor._session = mock.Mock(spec=requests.Session)
+    return extractor
+
+def test_shopify_follows_link_header_pages(extractor):
+    extractor._session.get.side_effect = [
+        _response([_order(1), _order(2, quantity=3)], next_url=NEXT_URL),
+        _response([_order(3)])
+    ]
+    
+    df = extractor.extract('shopify', '2024-01-01', '2024-01-31', 'orders')
+    
+    assert df['id'].tolist() == ['1', '2', '3']
+    assert df['item_count'].tolist() == [1, 3, 1]
+    assert df['customer_id'].tolist() == ['7', '7', '7']
+    
+    first, second = extractor._session.get.call_args_list
+    assert first == mock.call(
+        ORDERS_URL,
+        params={
+            'limit': 250,
+            'status': 'any',
+            'created_at_min': '2024-01-01T00:00:00',
+            'created_at_max': '2024-01-31T23:59:59'
+        },
+        auth=('key', 'secret'),
+        timeout=REQUEST_TIMEOUT
+    )
+    # Cursor URLs carry their own query string
+    assert second == mock.call(NEXT_URL, auth=('key', 'secret'), timeout=REQUEST_TIMEOUT)
+
+def test_shopify_empty_result_keeps_columns(extractor):
+    extractor._session.get.return_value = _response([])
+    
+    df = extractor.extract('shopify', '2024-01-01', '2024-01-31', 'orders')
+    
+    assert df.empty
+    assert 'total_price' in df.columns
+
+def test_shopify_http_error_falls_back_to_mock_data(extractor):
+    extractor._session.get.return_value = _response([], status=401)
+    
+    df = extractor.extract('shopify', '2024-01-01', '2024-01-31', 'orders')
+    
+    assert not df.empty
+    expected = extractor._mock_shopify_data('orders', datetime(2024, 1, 1), datetime(2024, 1, 31))
+    assert df['id'].tolist() == expected['id'].tolist()
+
+def test_shopify_malformed_payload_falls_back_to_mock_data(extractor):
+    response = _response([])
+    response.content = b'{"errors": "Not Found"}'
+    extractor._session.get.return_value = response
+    
+    df = extractor.extract('shopify', '2024-01-01', '2024-01-31', 'orders')
+    
+    assert not df.empty
+
+def test_shopify_closed_window_is_served_from_cache(extractor):
+    extractor._session.get.side_effect = [_response([_order(1)], next_url=NEXT_URL), _response([_order(2)])]
+    first = extractor.extract('shopify', '2024-01-01', '2024-01-31', 'orders')
+    
+    extractor._session.get.reset_mock(side_effect=True)
+    extractor._session.get.side_effect = AssertionError("cached query should not hit the API")
+    second = extractor.extract('shopify', '2024-01-01', '2024-01-31', 'orders')
+    
+    assert second.equals(first)
+
+def test_shopify_cache_is_keyed_by_store_and_credentials(extractor):
+    extractor._session.get.side_effect = [_response([_order(1)]), _response([_order(2)]), _response([_order(3)])]
+    extractor.extract('shopify', '2024-01-01', '2024-01-31', 'orders')
+    
+    extractor.shopify_api_secret = 'other-secret'
+    rotated = extractor.extract('shopify', '2024-01-01', '2024-01-31', 'orders')
+    
+    extractor.shopify_store = 'other-store.myshopify.com'
+    other_store = extractor.extract('shopify', '2024-01-01', '2024-01-31', 'orders')
+    
+    assert rotated['id'].tolist() == ['2']
+    assert other_store['id'].tolist() == ['3']
+    assert extractor._session.get.call_count == 3
+
+def test_shopify_cache_can_be_disabled(tmp_path):
+    config = MockConfig(tmp_path)
+    config.api_response_cache = False
+    extractor = APIExtractor(config)
+    extractor._session = mock.Mock(spec=requests.Session)
+    extractor._session.get.side_effect = [_response([_order(1)]), _response([_order(2)])]
+    
+    extractor.extract('shopify', '2024-01-01', '2024-01-31', 'orders')
+    df = extractor.extract('shopify', '2024-01-01', '2024-01-31', 'orders')
+    
+    assert df['id'].tolist() == ['2']
+    assert not (tmp_path / 'api' / 'cache').exists()
+
+def test_shopify_open_window_is_not_cached(extractor):
+    today = datetime.now().strftime('%Y-%m-%d')
+    extractor._session.get.side_effect = [_response([_order(1)]), _response([_order(2)])]
+    
+    extractor.extract('shopify', '2024-01-01', today, 'orders')
+    df = extractor.extract('shopify', '2024-01-01', today, 'orders')
+    
+    assert df['id'].tolist() == ['2']
+    assert extractor._session.get.call_count == 2
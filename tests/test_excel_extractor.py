@@ -0,0 +1,54 @@
+"""
+Tests for how ExcelExtractor names the columns of a streamed sheet.
+"""
+
+import openpyxl
+import pandas as pd
+
+from extractors.excel_extractor import ExcelExtractor
+
+class MockConfig:
+    """Minimal configuration pointing at a test workbook."""
+    
+    def __init__(self, customers_excel):
+        self.customers_excel = str(customers_excel)
+
+def _workbook(path, header, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = 'Customers'
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+    return path
+
+def test_blank_header_cell_is_named_like_pandas(tmp_path):
+    path = _workbook(tmp_path / 'blank.xlsx', ['customer_id', None, 'signup_date'],
+                     [[1, 'a', '2024-01-05'], [2, 'b', '2024-02-05']])
+    
+    df = ExcelExtractor(MockConfig(path)).extract()
+    
+    assert list(df.columns) == ['customer_id', 'Unnamed: 1', 'signup_date']
+    assert list(df.columns) == list(pd.read_excel(path).columns)
+    assert df['Unnamed: 1'].tolist() == ['a', 'b']
+
+def test_duplicate_headers_are_suffixed_like_pandas(tmp_path):
+    path = _workbook(tmp_path / 'duplicates.xlsx', ['id', 'order_date', 'id', 'id.1', 'id'],
+                     [[1, '2024-01-05', 10, 100, 1000], [2, '2024-03-05', 20, 200, 2000]])
+    
+    df = ExcelExtractor(MockConfig(path)).extract()
+    
+    assert list(df.columns) == ['id', 'order_date', 'id.2', 'id.1', 'id.3']
+    assert list(df.columns) == list(pd.read_excel(path).columns)
+    assert df['id.2'].tolist() == [10, 20]
+
+def test_column_lookups_use_normalized_names(tmp_path):
+    path = _workbook(tmp_path / 'lookups.xlsx', ['id', 'order_date', 'id', None],
+                     [[1, '2024-01-05', 10, 'x'], [2, '2024-03-05', 20, 'y']])
+    
+    df = ExcelExtractor(MockConfig(path)).extract(start_date='2024-02-01', date_column='order_date',
+                                                  columns=['id.1', 'Unnamed: 3'])
+    
+    assert list(df.columns) == ['id.1', 'Unnamed: 3']
+    assert df.values.tolist() == [[20, 'y']]
@@ -0,0 +1,74 @@
+"""
+Tests for the table check PDFExtractor runs before starting tabula.
+"""
+
+import pytest
+
+pytest.importorskip('pdfplumber')
+pytest.importorskip('reportlab')
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, TableStyle
+
+from extractors.pdf_extractor import PDFExtractor
+
+WIDTH, HEIGHT = letter
+
+ITEMS = [
+    ['Item', 'Quantity', 'Unit Price', 'Total'],
+    ['Smartphone', '2', '$650.00', '$1300.00'],
+    ['Laptop', '1', '$1200.50', '$1200.50'],
+    ['Headphones', '3', '$80.00', '$240.00']
+]
+
+class MockConfig:
+    """Minimal configuration pointing at a test invoice."""
+    
+    def __init__(self, invoices_pdf):
+        self.invoices_pdf = str(invoices_pdf)
+
+def _invoice(path, draw_body):
+    pdf = canvas.Canvas(str(path), pagesize=letter)
+    pdf.setFont('Helvetica-Bold', 24)
+    pdf.drawString(50, HEIGHT - 50, 'E-Commerce Invoice')
+    pdf.setFont('Helvetica', 12)
+    for i, line in enumerate(['Invoice #: INV-12345', 'Date: 2026-01-05', 'Customer ID: CUST-1234']):
+        pdf.drawString(50, HEIGHT - 100 - 20 * i, line)
+    draw_body(pdf)
+    pdf.save()
+    return path
+
+def _prose(pdf):
+    lines = [
+        'Thank you for your purchase! Your order of 3 items has been received and',
+        'will be shipped within 2 business days. If you have any questions about',
+        'this invoice, please contact our support team at support@example.com or',
+        'call 1-800-555-0100 between 9am and 5pm. We appreciate your business.'
+    ]
+    for i, line in enumerate(lines):
+        pdf.drawString(50, HEIGHT - 200 - 16 * i, line)
+    pdf.drawString(350, HEIGHT - 300, 'Total: $123.45')
+
+def _borderless_table(pdf):
+    for i, row in enumerate(ITEMS):
+        for x, value in zip((50, 250, 350, 450), row):
+            pdf.drawString(x, HEIGHT - 200 - 18 * i, value)
+
+def _ruled_table(pdf):
+    table = Table(ITEMS, colWidths=[200, 100, 100, 100])
+    table.setStyle(TableStyle([('GRID', (0, 0), (-1, -1), 1, 'black')]))
+    table.wrapOn(pdf, WIDTH, HEIGHT)
+    table.drawOn(pdf, 50, HEIGHT - 300)
+
+def test_prose_only_pdf_has_no_tables(tmp_path):
+    path = _invoice(tmp_path / 'prose.pdf', _prose)
+    assert not PDFExtractor(MockConfig(path))._has_tables()
+
+def test_borderless_table_is_detected(tmp_path):
+    path = _invoice(tmp_path / 'borderless.pdf', _borderless_table)
+    assert PDFExtractor(MockConfig(path))._has_tables()
+
+def test_ruled_table_is_detected(tmp_path):
+    path = _invoice(tmp_path / 'ruled.pdf', _ruled_table)
+    assert PDFExtractor(MockConfig(path))._has_tables()